@@ -0,0 +1,130 @@
+"""Interpreter latency benchmark.
+
+Times getting a program's output from its pseudocode, end to end, each as a fresh process:
+
+    compile + run   main.py writes out.py, then python3 out.py
+    --run           main.py compiles to a code object and runs it in-process (no code cache)
+    --interpret     main.py runs the syntax tree directly
+
+for a tiny program (test.txt) and for a loop that does real work, which shows where the closures
+start to cost more than the saved compile. Interpreter startup is most of a tiny program's time, so the
+same is also timed in-process, from source text to output:
+
+    python3 benchmarks/bench_interp.py --count 100000
+"""
+import argparse
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN = os.path.join(ROOT, "compiler", "main.py")
+sys.path.insert(0, os.path.join(ROOT, "compiler"))
+
+import driver
+import interp
+import pyrun
+from backends import pyast
+
+LOOP_PROGRAM = """DECLARE total : INTEGER
+DECLARE i : INTEGER
+total = 0
+i = 0
+WHILE i < {count}
+    IF i < 10 THEN
+        total = total + i * 2
+    ELSE
+        total = total - 1
+    ENDIF
+    i = i + 1
+ENDWHILE
+OUTPUT total
+"""
+
+
+def best(commands, repeat):
+    # Best wall time of running every command in turn, and the output of the last one
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for command in commands:
+            result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True)
+        times.append(time.perf_counter() - start)
+
+    return min(times), result.stdout
+
+
+def compiled(source):
+    code = compile(pyast.Builder().module(driver.parse(source)), "<program>", "exec")
+    pyrun.run(code)
+
+
+def interpreted(source):
+    interp.run(driver.parse(source))
+
+
+def inProcess(source, repeat):
+    times = {}
+    for function in (compiled, interpreted):
+        elapsed = []
+        for _ in range(repeat):
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                function(source)
+                elapsed.append(time.perf_counter() - start)
+
+        times[function] = min(elapsed)
+
+    print(f"  in-process: compile + exec {times[compiled] * 1000:.2f} ms, "
+          f"interpret {times[interpreted] * 1000:.2f} ms ({times[compiled] / times[interpreted]:.2f}x)")
+
+
+def compare(name, source, work, repeat):
+    path = os.path.join(work, "program.txt")
+    with open(path, 'w') as f:
+        f.write(source)
+
+    python = sys.executable
+    modes = {
+        "compile + run": [[python, MAIN, path, "--no-cache"], [python, os.path.join(work, "out.py")]],
+        "--run": [[python, MAIN, path, "--run", "--no-cache"]],
+        "--interpret": [[python, MAIN, path, "--interpret"]],
+    }
+
+    print(name)
+    outputs = set()
+    baseline = None
+    for mode, commands in modes.items():
+        elapsed, output = best(commands, repeat)
+        outputs.add(output)
+
+        baseline = baseline or elapsed
+        print(f"  {mode:<14} {elapsed * 1000:8.1f} ms  ({baseline / elapsed:.2f}x)")
+
+    if len(outputs) != 1:
+        sys.exit("Error: the modes printed different output.")
+
+    inProcess(source, repeat)
+
+
+def main():
+    args = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    args.add_argument("--count", type=int, default=100000, help="iterations of the loop program")
+    args.add_argument("--repeat", type=int, default=5)
+    options = args.parse_args()
+
+    with open(os.path.join(ROOT, "test.txt")) as f:
+        tiny = f.read()
+
+    with tempfile.TemporaryDirectory() as work:
+        os.chdir(work)  # main.py writes out.py into the working directory
+        compare("test.txt", tiny, work, options.repeat)
+        compare(f"loop of {options.count:,}", LOOP_PROGRAM.format(count=options.count), work, options.repeat)
+
+
+if __name__ == "__main__":
+    main()
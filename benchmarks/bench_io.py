@@ -0,0 +1,103 @@
+"""Generated program I/O benchmark.
+
+Compiles an OUTPUT-heavy loop and an INPUT-heavy loop with and without --fast-io, runs each program with
+its output going to a pipe and reports the best wall time. C++ programs are built with g++ (or $CXX) -O2
+and skipped if there's no compiler:
+
+    python3 benchmarks/bench_io.py --count 1000000
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "compiler"))
+
+import driver
+
+OUTPUT_PROGRAM = """DECLARE total : INTEGER
+total = 0
+FOR i = 0 TO {count}
+    total = total + i
+    OUTPUT total
+    OUTPUT "step"
+NEXT i
+"""
+
+INPUT_PROGRAM = """DECLARE total : INTEGER
+DECLARE n : INTEGER
+total = 0
+FOR i = 0 TO {count}
+    INPUT n
+    total = total + n
+NEXT i
+OUTPUT total
+"""
+
+
+def timeRun(command, stdin, repeat):
+    best = None
+    output = None
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run(command, input=stdin, stdout=subprocess.PIPE, check=True)
+        elapsed = time.perf_counter() - start
+
+        output = result.stdout
+        if best is None or elapsed < best:
+            best = elapsed
+
+    return best, output
+
+
+def build(backend, program, path, fastIO, compiler):
+    # Command that runs the generated program
+    driver.generate(program, backend, path, fastIO)
+    if backend.NAME == "Python":
+        return [sys.executable, path]
+
+    binary = path + ".bin"
+    subprocess.run([compiler, "-O2", "-o", binary, path], check=True)
+    return [binary]
+
+
+def main():
+    args = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    args.add_argument("--count", type=int, default=500000, help="loop iterations")
+    args.add_argument("--repeat", type=int, default=3)
+    options = args.parse_args()
+
+    compiler = shutil.which(os.environ.get("CXX", "g++"))
+    targets = ["py", "cpp"] if compiler else ["py"]
+    count = options.count
+
+    cases = [
+        ("OUTPUT", OUTPUT_PROGRAM, None, count * 2),
+        ("INPUT", INPUT_PROGRAM, "".join(f"{i % 1000}\n" for i in range(count)).encode(), count),
+    ]
+
+    with tempfile.TemporaryDirectory() as work:
+        for name, source, stdin, lines in cases:
+            program = driver.parse(source.format(count=count))
+            print(f"{name}-heavy loop, {lines:,} lines")
+
+            for backend in driver.loadBackends(targets):
+                results = {}
+                for fastIO in (False, True):
+                    path = os.path.join(work, f"{name}{fastIO}{os.path.splitext(backend.OUTPUT)[1]}")
+                    results[fastIO] = timeRun(build(backend, program, path, fastIO, compiler), stdin, options.repeat)
+
+                (plain, output), (fast, fastOutput) = results[False], results[True]
+                assert output == fastOutput, "fast I/O changed the program's output"
+
+                print(f"  {backend.NAME:6} plain:     {plain:7.3f}s  ({lines / plain:12,.0f} lines/s)")
+                print(f"  {backend.NAME:6} --fast-io: {fast:7.3f}s  ({lines / fast:12,.0f} lines/s)  {plain / fast:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Lexer micro-benchmark.
+
+Tokenizes a large generated pseudocode input and reports tokens per second.
+Pass --against <git revision> to also time the lexer from that revision on the same input:
+
+    python3 benchmarks/bench_lex.py --lines 20000 --against HEAD~1
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "compiler"))
+
+import lex
+
+
+def makeSource(lines):
+    with open(os.path.join(ROOT, "test.txt")) as f:
+        sample = f.read().splitlines()
+
+    sample.append("x = x + 12 * 3.25 - num // trailing comment")
+    return "\n".join(sample[i % len(sample)] for i in range(lines))
+
+
+def loadRevision(rev):
+    source = subprocess.run(["git", "show", f"{rev}:compiler/lex.py"], cwd=ROOT,
+                            capture_output=True, text=True, check=True).stdout
+    module = types.ModuleType(f"lex_{rev}")
+    exec(compile(source, f"{rev}:compiler/lex.py", "exec"), module.__dict__)
+    return module
+
+
+def run(module, source, repeat):
+    best = None
+    count = 0
+
+    for _ in range(repeat):
+        lexer = module.Lexer(source)
+        eof = module.TokenType.EOF
+        count = 0
+
+        start = time.perf_counter()
+        while lexer.getToken().kind != eof:
+            count += 1
+        elapsed = time.perf_counter() - start
+
+        if best is None or elapsed < best:
+            best = elapsed
+
+    return count, best
+
+
+def peakMemory(module, source):
+    # Peak traced memory while holding on to every token, in a TokenBuffer where the lexer has one
+    tracemalloc.start()
+    lexer = module.Lexer(source)
+    if hasattr(lexer, "tokenize"):
+        tokens = lexer.tokenize()
+    else:
+        eof = module.TokenType.EOF
+        tokens = [lexer.getToken()]
+        while tokens[-1].kind != eof:
+            tokens.append(lexer.getToken())
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    args = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    args.add_argument("--lines", type=int, default=20000)
+    args.add_argument("--repeat", type=int, default=3)
+    args.add_argument("--against", metavar="REV", help="git revision to compare with")
+    options = args.parse_args()
+
+    source = makeSource(options.lines)
+    print(f"Input: {options.lines} lines, {len(source)} chars")
+
+    count, elapsed = run(lex, source, options.repeat)
+    rate = count / elapsed
+    print(f"current: {count} tokens in {elapsed:.3f}s ({rate:,.0f} tokens/s), "
+          f"peak {peakMemory(lex, source) / 2**20:.1f} MiB holding all tokens")
+
+    if options.against:
+        old = loadRevision(options.against)
+        oldCount, oldElapsed = run(old, source, options.repeat)
+        oldRate = oldCount / oldElapsed
+        print(f"{options.against}: {oldCount} tokens in {oldElapsed:.3f}s ({oldRate:,.0f} tokens/s), "
+              f"peak {peakMemory(old, source) / 2**20:.1f} MiB holding all tokens")
+        print(f"speedup: {rate / oldRate:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
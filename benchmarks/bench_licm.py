@@ -0,0 +1,164 @@
+"""Loop-invariant code motion benchmark.
+
+Runs loop-heavy programs compiled at -O1 and -O2, which only differ by the loop-invariant code motion (there are no
+CONSTANTs to substitute), and reports the run time of each. The generated Python is run in this process, and so is
+the interpreter. Both levels have to print the same. Programs that stop with an error are checked first: both
+levels have to print the same before failing the same way, since nothing that can fail may be moved ahead of OUTPUT.
+
+    python3 benchmarks/bench_licm.py --count 200000
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "compiler"))
+
+import driver
+import interp
+from emit import Emitter
+from backends import python
+
+PROGRAMS = {
+    # Invariant arithmetic in a FOR body, and an assignment that only has to happen once
+    "for": """DECLARE width : INTEGER
+DECLARE height : INTEGER
+DECLARE depth : INTEGER
+DECLARE area : INTEGER
+DECLARE total : INTEGER
+width = 12
+height = 7
+depth = 3
+total = 0
+FOR i = 0 TO {count}
+    area = width * height
+    total = total + width * height * depth - area / depth + i
+NEXT i
+OUTPUT total
+""",
+    # The inner loop's body only depends on the outer iterator
+    "nested": """DECLARE n : INTEGER
+DECLARE total : INTEGER
+DECLARE cells : [0:99] OF INTEGER
+n = 100
+total = 0
+FOR i = 0 TO {count} / 100
+    FOR j = 0 TO n
+        cells[j] = cells[j] + i * n * 2 - i / 3
+    NEXT j
+NEXT i
+FOR j = 0 TO n
+    total = total + cells[j]
+NEXT j
+OUTPUT total
+""",
+    # An invariant bound in the WHILE condition
+    "while": """DECLARE limit : INTEGER
+DECLARE step : INTEGER
+DECLARE i : INTEGER
+DECLARE total : INTEGER
+limit = {count}
+step = 3
+i = 0
+total = 0
+WHILE i < limit * step - step * 2
+    total = total + i * 2 - step * step
+    i = i + step
+ENDWHILE
+OUTPUT total
+""",
+}
+
+# Programs that stop with an error part way through
+FAILING = {
+    # a is never given a value, so a * 2 fails on the first pass, after i has been printed
+    "unassigned": """DECLARE a : INTEGER
+DECLARE t : INTEGER
+t = 0
+FOR i = 0 TO 3
+    OUTPUT i
+    t = t + a * 2
+NEXT i
+""",
+}
+
+
+def generated(program):
+    emitter = Emitter(None)
+    python.Generator(emitter).program(program)
+    return compile(emitter.getCode(), "<out.py>", "exec")
+
+
+def best(function, repeat):
+    # Shortest time function takes, and what it printed
+    times = []
+    for _ in range(repeat):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            start = time.perf_counter()
+            function()
+            times.append(time.perf_counter() - start)
+
+    return min(times), output.getvalue()
+
+
+def outcome(function):
+    # What function printed, and the type of error it stopped with
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        try:
+            function()
+        except Exception as error:
+            return output.getvalue(), type(error).__name__
+
+    return output.getvalue(), None
+
+
+def check():
+    for name, source in FAILING.items():
+        runners = {"generated Python": lambda level: lambda: exec(generated(driver.parse(source, level)), {}),
+                   "--interpret": lambda level: interp.Interpreter(driver.parse(source, level)).run}
+
+        for mode, runner in runners.items():
+            if outcome(runner(1)) != outcome(runner(2)):
+                sys.exit(f"Error: {name} ({mode}) printed different output or failed differently at -O1 and -O2.")
+
+
+def main():
+    args = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    args.add_argument("--count", type=int, default=200000, help="loop iterations (default: 200000)")
+    args.add_argument("--repeat", type=int, default=5)
+    options = args.parse_args()
+
+    check()
+
+    for name, template in PROGRAMS.items():
+        source = template.format(count=options.count)
+        print(name)
+
+        for mode in ("generated Python", "--interpret"):
+            times = {}
+            outputs = set()
+            for level in (1, 2):
+                if mode == "--interpret":
+                    runner = interp.Interpreter(driver.parse(source, level))
+                    function = runner.run
+                else:
+                    code = generated(driver.parse(source, level))
+                    function = lambda: exec(code, {})
+
+                times[level], output = best(function, options.repeat)
+                outputs.add(output)
+
+            if len(outputs) != 1:
+                sys.exit(f"Error: {name} printed different output at -O1 and -O2.")
+
+            print(f"  {mode:<17} -O1 {times[1] * 1000:8.1f} ms   -O2 {times[2] * 1000:8.1f} ms   "
+                  f"({times[1] / times[2]:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
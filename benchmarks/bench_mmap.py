@@ -0,0 +1,77 @@
+"""Large file lexing benchmark.
+
+Writes a generated pseudocode file of --megabytes, then lexes it in a fresh process both ways, streaming tokens
+without keeping them: read into a str for Lexer, and memory-mapped for FileLexer. Reports the time and the
+process's peak resident memory. Half the size is also run, to show which one grows with the file:
+
+    python3 benchmarks/bench_mmap.py --megabytes 300
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from generate import flat
+
+# Run in the child process: argv is mode, path
+CHILD = """
+import mmap, resource, sys, time
+sys.path.insert(0, {compiler!r})
+from lex import *
+
+mode, path = sys.argv[1:]
+start = time.perf_counter()
+
+if mode == "str":
+    with open(path, 'r') as i:
+        lexer = Lexer(i.read())
+else:
+    i = open(path, 'rb')
+    lexer = FileLexer(mmap.mmap(i.fileno(), 0, access=mmap.ACCESS_READ))
+
+count = 0
+while lexer.getToken().kind is not TokenType.EOF:
+    count += 1
+
+print(count, time.perf_counter() - start, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def write(path, megabytes):
+    chunk = flat(20000).encode()
+    with open(path, 'wb') as f:
+        for _ in range(max(1, megabytes * 2**20 // len(chunk))):
+            f.write(chunk)
+
+
+def lex(mode, path):
+    child = CHILD.format(compiler=os.path.join(ROOT, "compiler"))
+    result = subprocess.run([sys.executable, "-c", child, mode, path], capture_output=True, text=True, check=True)
+    count, elapsed, peak = result.stdout.split()
+    return int(count), float(elapsed), int(peak) / 1024  # ru_maxrss is in KiB on Linux
+
+
+def main():
+    args = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    args.add_argument("--megabytes", type=int, default=300)
+    options = args.parse_args()
+
+    with tempfile.TemporaryDirectory() as work:
+        path = os.path.join(work, "big.txt")
+
+        for megabytes in (options.megabytes // 2, options.megabytes):
+            write(path, megabytes)
+            print(f"{os.path.getsize(path) / 2**20:,.0f} MiB source")
+
+            for mode, name in (("str", "read() + Lexer"), ("mmap", "mmap + FileLexer")):
+                count, elapsed, peak = lex(mode, path)
+                print(f"  {name:<17} {count:>12,} tokens in {elapsed:7.1f} s ({count / elapsed:>9,.0f}/s), "
+                      f"peak RSS {peak:7.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
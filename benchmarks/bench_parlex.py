@@ -0,0 +1,70 @@
+"""Parallel lexing benchmark.
+
+Lexes generated sources of a few sizes into a TokenBuffer, serially (Lexer.tokenize) and with parlex.tokenize
+for each worker count in --jobs, and reports the speedup over serial. Every parallel buffer is checked against the
+serial one. The speedup can't go past the number of cores the process may run on, which is printed first:
+
+    python3 benchmarks/bench_parlex.py --megabytes 4 16 --jobs 1 2 4 8
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "compiler"))
+
+from lex import *
+import parlex
+from generate import flat
+
+
+def best(function, repeat):
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+
+    return min(times), result
+
+
+def source(megabytes):
+    # One program, so identifiers are declared once however big it gets
+    lines = 1000
+    while len(flat(lines)) < megabytes * 2**20:
+        lines *= 2
+
+    text = flat(lines)
+    return text[: text.rfind("\n", 0, megabytes * 2**20) + 1]
+
+
+def main():
+    args = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    args.add_argument("--megabytes", type=int, nargs="+", default=[4, 16])
+    args.add_argument("--jobs", type=int, nargs="+", default=[1, 2, 4, 8])
+    args.add_argument("--repeat", type=int, default=3)
+    options = args.parse_args()
+
+    cores = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+    print(f"{cores} usable core{'s' if cores != 1 else ''}")
+
+    for megabytes in options.megabytes:
+        text = source(megabytes)
+        serial, expected = best(lambda: Lexer(text).tokenize(), options.repeat)
+        print(f"{len(text) / 2**20:,.1f} MiB, {len(expected):,} tokens")
+        print(f"  {'serial':<8} {serial:7.2f} s ({len(expected) / serial:>10,.0f} tokens/s)")
+
+        for jobs in options.jobs:
+            elapsed, buffer = best(lambda: parlex.tokenize(text, jobs), options.repeat)
+            if any(getattr(buffer, name) != getattr(expected, name) for name in ("kinds", "starts", "ends", "lines")):
+                sys.exit(f"{jobs} jobs: token stream differs from serial lexing")
+
+            print(f"  {f'{jobs} jobs':<8} {elapsed:7.2f} s ({len(buffer) / elapsed:>10,.0f} tokens/s), "
+                  f"{serial / elapsed:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
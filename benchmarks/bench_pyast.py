@@ -0,0 +1,69 @@
+"""In-process Python code generation benchmark.
+
+Times getting from a parsed program to a code object both ways: generating source text and having
+CPython parse it in compile(), against building the ast.Module directly (what --run does):
+
+    python3 benchmarks/bench_pyast.py --lines 20000
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "compiler"))
+
+import driver
+from emit import Emitter
+from backends import pyast, python
+
+
+def makeSource(lines):
+    with open(os.path.join(ROOT, "test.txt")) as f:
+        sample = f.read()
+
+    # test.txt declares its variables, so give every copy its own names
+    copies = max(1, lines // sample.count("\n"))
+    return "\n".join(sample.replace("x", f"x{i}").replace("num", f"num{i}").replace("sum", f"sum{i}")
+                     for i in range(copies))
+
+
+def viaText(program):
+    emitter = Emitter(None)
+    python.Generator(emitter).program(program)
+    return compile(emitter.getCode(), "<text>", "exec")
+
+
+def viaAst(program):
+    return compile(pyast.Builder().module(program), "<ast>", "exec")
+
+
+def best(function, program, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(program)
+        times.append(time.perf_counter() - start)
+
+    return min(times)
+
+
+def main():
+    args = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    args.add_argument("--lines", type=int, default=20000)
+    args.add_argument("--repeat", type=int, default=5)
+    options = args.parse_args()
+
+    source = makeSource(options.lines)
+    program = driver.parse(source)
+
+    text = best(viaText, program, options.repeat)
+    tree = best(viaAst, program, options.repeat)
+
+    print(f"{source.count(chr(10)) + 1:,} lines of pseudocode to a code object")
+    print(f"  source text + compile(): {text * 1000:8.1f} ms")
+    print(f"  ast.Module + compile():  {tree * 1000:8.1f} ms  ({text / tree:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
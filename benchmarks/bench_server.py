@@ -0,0 +1,104 @@
+"""Compile server benchmark.
+
+Compiles the same file N times three ways and reports requests per second:
+a cold `python3 compiler/main.py` process per compile, a `client.py` process per compile talking to a
+running server, and concurrent requests sent straight to the server socket (the raw throughput).
+
+    python3 benchmarks/bench_server.py --requests 50 --concurrency 8
+"""
+import argparse
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COMPILER = os.path.join(ROOT, "compiler")
+sys.path.insert(0, COMPILER)
+
+import client
+
+
+def timeProcesses(command, count, cwd, env):
+    start = time.perf_counter()
+    for _ in range(count):
+        subprocess.run(command, cwd=cwd, env=env, stdout=subprocess.DEVNULL, check=True)
+    return time.perf_counter() - start
+
+
+def timeSocket(path, message, count, concurrency):
+    def send(_):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(path)
+            return client.request(sock, message)["status"]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        statuses = list(pool.map(send, range(count)))
+    elapsed = time.perf_counter() - start
+
+    assert not any(statuses), "server reported a failed compile"
+    return elapsed
+
+
+def waitForSocket(path, server):
+    for _ in range(200):
+        if server.poll() is not None:
+            sys.exit("Compile server exited during startup.")
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.connect(path)
+                return
+        except OSError:
+            time.sleep(0.05)
+
+    sys.exit("Compile server did not start.")
+
+
+def main():
+    args = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    args.add_argument("--requests", type=int, default=50)
+    args.add_argument("--concurrency", type=int, default=8)
+    args.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args.add_argument("--targets", default="py")
+    options = args.parse_args()
+
+    work = tempfile.mkdtemp(prefix="cie-bench-")
+    path = os.path.join(work, "server.sock")
+    shutil.copy(os.path.join(ROOT, "test.txt"), work)
+
+    # The cache would turn every run after the first into a copy, measure the compiles themselves
+    env = dict(os.environ, CIE_SOCKET=path, CIE_CACHE_DIR=os.path.join(work, "cache"))
+    targets = options.targets
+    count = options.requests
+
+    cold = timeProcesses([sys.executable, os.path.join(COMPILER, "main.py"), "test.txt", targets, "--no-cache"],
+                         count, work, env)
+
+    server = subprocess.Popen([sys.executable, os.path.join(COMPILER, "server.py"), "--socket", path,
+                               "-j", str(options.workers)], env=env, stdout=subprocess.DEVNULL)
+    try:
+        waitForSocket(path, server)
+
+        thin = timeProcesses([sys.executable, os.path.join(COMPILER, "client.py"), "test.txt", targets, "--no-cache"],
+                             count, work, env)
+        message = {"cwd": work, "path": "test.txt", "targets": targets.split(","), "cache": False}
+        raw = timeSocket(path, message, count, options.concurrency)
+
+    finally:
+        server.terminate()
+        server.wait()
+        shutil.rmtree(work, ignore_errors=True)
+
+    print(f"{count} compiles of test.txt to {targets}, {options.workers} server workers")
+    print(f"  cold main.py:         {count / cold:8.1f} req/s  ({cold / count * 1000:.1f} ms each)")
+    print(f"  client.py + server:   {count / thin:8.1f} req/s  ({thin / count * 1000:.1f} ms each)")
+    print(f"  socket, {options.concurrency:2} in flight: {count / raw:8.1f} req/s  ({raw / count * 1000:.2f} ms each)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Compiler throughput suite.
+
+Generates each synthetic workload (see generate.py) and times the lex, parse and emit phases separately, emitting
+for both backends. Throughput is in source tokens per second, the best of --repeat runs, and is compared with the
+stored baseline (benchmarks/baseline.json). The suite fails if any phase is still more than --threshold slower after
+measuring it again:
+
+    python3 benchmarks/bench_suite.py                # compare with the baseline
+    python3 benchmarks/bench_suite.py --save         # record a new baseline (the median of several runs)
+    python3 benchmarks/bench_suite.py -w nested -w flat --scale 0.5
+
+Timings depend on the machine, so record the baseline on the one the suite is checked on.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+sys.path.insert(0, os.path.join(ROOT, "compiler"))
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+sys.setrecursionlimit(10000)  # The parser and backends recurse once per nested block and operator
+
+import driver
+from emit import Emitter
+from lex import Lexer
+from parser import Parser
+from typecheck import TypeChecker
+from backends import cpp, python
+from generate import WORKLOADS
+
+BACKENDS = {"python": python, "cpp": cpp}
+
+
+def best(phase, prepare, repeat):
+    # Shortest time phase takes on what prepare() returns, prepared afresh for every run. Timings on a busy
+    # machine only ever come out slower, so many short runs and the fastest of them is what's stable.
+    # The collector runs at points that depend on everything allocated before, so it's kept out of the way.
+    times = []
+    for _ in range(repeat):
+        data = prepare()
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            phase(data)
+            times.append(time.perf_counter() - start)
+        finally:
+            gc.enable()
+
+    return min(times)
+
+
+def emit(backend, program):
+    emitter = Emitter(None)
+    backend.Generator(emitter).program(program)
+    return emitter.getCode()
+
+
+def measure(source, repeat):
+    # Tokens per second for every phase of compiling source
+    tokens = len(Lexer(source).tokenize())
+    program = TypeChecker().program(Parser(Lexer(source).tokenize()).program())
+
+    times = {
+        "lex": best(lambda _: Lexer(source).tokenize(), lambda: None, repeat),
+        "parse": best(lambda buffer: Parser(buffer).program(), lambda: Lexer(source).tokenize(), repeat),
+    }
+    for name, backend in BACKENDS.items():
+        times[f"emit {name}"] = best(lambda _: emit(backend, program), lambda: None, repeat)
+
+    return tokens, {phase: round(tokens / elapsed) for phase, elapsed in times.items()}
+
+
+def main():
+    args = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    args.add_argument("-w", "--workload", action="append", choices=WORKLOADS,
+                      help="only run this workload (can be repeated)")
+    args.add_argument("--scale", type=float, default=1.0, help="multiply every workload's size")
+    args.add_argument("--repeat", type=int, default=20)
+    args.add_argument("--threshold", type=float, default=0.3,
+                      help="fail if a phase is this fraction slower than the baseline (default: 0.3)")
+    args.add_argument("--retries", type=int, default=2,
+                      help="times to measure a workload again before reporting it as regressed (default: 2)")
+    args.add_argument("--save", action="store_true", help="record the results as the new baseline")
+    args.add_argument("--baseline", default=BASELINE, help="baseline file (default: benchmarks/baseline.json)")
+    options = args.parse_args()
+
+    baseline = {}
+    if not options.save and os.path.exists(options.baseline):
+        with open(options.baseline) as f:
+            baseline = json.load(f)["results"]
+
+    results = {}
+    regressions = []
+
+    for name in options.workload or WORKLOADS:
+        function, size = WORKLOADS[name]
+        source = function(max(1, int(size * options.scale)))
+
+        expected = baseline.get(name, {})
+        tokens, rates = measure(source, options.repeat)
+
+        if options.save:  # The baseline is the typical speed, not a lucky one
+            runs = [rates] + [measure(source, options.repeat)[1] for _ in range(options.retries)]
+            rates = {phase: statistics.median(run[phase] for run in runs) for phase in rates}
+
+        # A busy machine can slow down a whole phase, so it only counts as a regression if it's still slow
+        # when measured again
+        for _ in range(options.retries):
+            if not any(rate < expected.get(phase, 0) * (1 - options.threshold) for phase, rate in rates.items()):
+                break
+
+            _, again = measure(source, options.repeat)
+            rates = {phase: max(rate, again[phase]) for phase, rate in rates.items()}
+
+        results[name] = rates
+        print(f"{name}: {source.count(chr(10)):,} lines, {tokens:,} tokens")
+
+        for phase, rate in rates.items():
+            line = f"  {phase:<12} {rate:>12,.0f} tokens/s"
+
+            if phase in expected:
+                change = rate / expected[phase] - 1
+                line += f"  {change:+7.1%} vs baseline"
+
+                if change < -options.threshold:
+                    regressions.append(f"{name} {phase}")
+                    line += "  REGRESSION"
+
+            print(line)
+
+    if options.save:
+        with open(options.baseline, 'w') as f:
+            json.dump({"compiler": driver.VERSION, "python": platform.python_version(), "machine": platform.machine(),
+                       "scale": options.scale, "results": results}, f, indent=2)
+            f.write("\n")
+        print(f"Baseline saved to {options.baseline}")
+
+    elif not baseline:
+        print("No baseline to compare with, record one with --save")
+
+    if regressions:
+        sys.exit(f"Error: throughput regressed more than {options.threshold:.0%}: {', '.join(regressions)}")
+
+
+if __name__ == "__main__":
+    main()
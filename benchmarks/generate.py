@@ -0,0 +1,144 @@
+"""Synthetic pseudocode generator.
+
+Writes valid programs that stress one part of the compiler each, for benchmarking:
+
+    flat         a long run of simple statements at the top level
+    nested       IF, FOR and WHILE nested inside each other, 40 levels deep
+    identifiers  thousands of DECLAREd variables, all in use
+    elsechain    IFs with long ELSE IF chains
+    expressions  assignments with huge arithmetic expressions
+
+    python3 benchmarks/generate.py nested --size 2000 -o nested.txt
+"""
+import argparse
+import sys
+
+
+def flat(size):
+    lines = ["DECLARE total : INTEGER", "DECLARE ratio : REAL", "total = 0", "ratio = 0.5"]
+
+    for i in range(size):
+        match i % 4:
+            case 0:
+                lines.append(f"total = total + {i}")
+            case 1:
+                lines.append(f"ratio = ratio * 1.5 - total / {i}")
+            case 2:
+                lines.append("OUTPUT total  // progress")
+            case 3:
+                lines.append(f'OUTPUT "line {i}"')
+
+    return "\n".join(lines) + "\n"
+
+
+def nested(size, depth=40):
+    # size statements in total, in groups nested depth levels deep. Each level gets its own loop variable.
+    lines = ["DECLARE total : INTEGER", "total = 0"]
+    written = 0
+    group = 0
+
+    while written < size:
+        closers = []
+        for level in range(depth):
+            indent = "    " * level
+            name = f"i{group}_{level}"
+
+            match level % 3:
+                case 0:
+                    lines.append(f"{indent}IF total < {level} THEN")
+                    closers.append(f"{indent}ENDIF")
+                case 1:
+                    lines.append(f"{indent}FOR {name} = 0 TO 2")
+                    closers.append(f"{indent}NEXT {name}")
+                case 2:
+                    lines.append(f"{indent}WHILE total > {level}")
+                    closers.append(f"{indent}ENDWHILE")
+
+            lines.append(f"{indent}    total = total + {level}")
+            written += 2
+
+        lines.extend(reversed(closers))
+        written += depth
+        group += 1
+
+    return "\n".join(lines) + "\n"
+
+
+def identifiers(size):
+    types = ("INTEGER", "REAL", "BOOLEAN", "STRING")
+    values = ("{i}", "{i}.5", "TRUE", None)
+    lines = []
+
+    for i in range(size):
+        kind = i % len(types)
+        lines.append(f"DECLARE var{i} : {types[kind]}")
+        if values[kind] is not None:
+            lines.append(f"var{i} = {values[kind].format(i=i)}")
+
+    # Every variable is read again, so lookups cover the whole table
+    for i in range(0, size, 4):
+        lines.append(f"var{i} = var{i} + var{(i + 4) % size}")
+
+    return "\n".join(lines) + "\n"
+
+
+def elseChain(size, length=50):
+    lines = ["DECLARE x : INTEGER", "x = 0"]
+
+    for _ in range(max(1, size // (length * 2))):
+        lines.append("IF x == 0 THEN")
+        lines.append("    x = x + 1")
+        for branch in range(1, length):
+            lines.append(f"ELSE IF x == {branch} THEN")
+            lines.append(f"    x = x + {branch}")
+        lines.append("ELSE")
+        lines.append("    OUTPUT x")
+        lines.append("ENDIF")
+
+    return "\n".join(lines) + "\n"
+
+
+def expressions(size, terms=200):
+    # Code generation recurses down the left edge of an expression, so terms stays well inside the recursion limit
+    operators = (" + ", " * ", " - ", " / ")
+    lines = ["DECLARE a : REAL", "DECLARE b : REAL", "a = 1.5", "b = 2.5"]
+
+    for i in range(size):
+        parts = ["a"]
+        for term in range(1, terms):
+            parts.append(operators[(i + term) % len(operators)])
+            parts.append("b" if term % 3 else str(term))
+        lines.append(("b = " if i % 2 else "a = ") + "".join(parts))
+
+    return "\n".join(lines) + "\n"
+
+
+# Generator and the default size used by the benchmark suite
+WORKLOADS = {
+    "flat": (flat, 5000),
+    "nested": (nested, 4000),
+    "identifiers": (identifiers, 2000),
+    "elsechain": (elseChain, 4000),
+    "expressions": (expressions, 20),
+}
+
+
+def main():
+    args = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    args.add_argument("workload", choices=WORKLOADS)
+    args.add_argument("--size", type=int, help="roughly how many statements to write (default: the suite's size)")
+    args.add_argument("-o", "--output", help="file to write (default: stdout)")
+    options = args.parse_args()
+
+    function, size = WORKLOADS[options.workload]
+    source = function(options.size or size)
+
+    if options.output is None:
+        sys.stdout.write(source)
+    else:
+        with open(options.output, 'w') as f:
+            f.write(source)
+
+
+if __name__ == "__main__":
+    main()
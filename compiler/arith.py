@@ -0,0 +1,7 @@
+# Arithmetic shared by the optimizer, which folds it at compile time, and the interpreter, which runs it
+
+
+def divide(a, b):
+    # INTEGER division, truncating towards zero like C++ and the generated Python
+    q = a // b
+    return q + 1 if q < 0 and q * b != a else q
@@ -0,0 +1,22 @@
+import importlib
+import sys
+
+# Code generation backends, by target name. A backend module provides NAME, OUTPUT (the default
+# output file), LANGUAGE (what --run runs it as), INCREMENTAL (whether watch mode can generate top-level
+# statements on their own) and a Generator class taking an Emitter; it is only imported once a target selects it.
+BACKENDS = {
+    "py": "python",
+    "python": "python",
+    "pyast": "pyast",
+    "cpp": "cpp",
+    "c++": "cpp",
+}
+
+
+def load(target):
+    module = BACKENDS.get(target.lower())
+
+    if module is None:
+        sys.exit(f"Invalid language specified: '{target}'.")
+
+    return importlib.import_module(f"backends.{module}")
@@ -0,0 +1,88 @@
+from nodes import *
+
+# Binding strength of arithmetic operators, used to put back the brackets the tree structure implies
+PRECEDENCE = {"+": 1, "-": 1, "*": 2, "/": 2, "//": 2}
+UNARY_PRECEDENCE = 3
+
+
+class Generator():
+    true = "True"
+    false = "False"
+    operators = {}  # Operators written differently in the target language
+    conversions = {"INTEGER": "int", "REAL": "float"}  # Convert node type -> conversion applied to the value
+
+    def __init__(self, emitter, fastIO=False) -> None:
+        self.emitter = emitter
+        self.fastIO = fastIO  # Generate buffered input and output instead of the plain standard library calls
+        self.requires = set()  # Imports/includes the generated statements need
+
+    def program(self, program):
+        # begin() and end() write what goes around the top-level statements, which are emitted one scope in
+        self.begin()
+
+        for statement in program.body:
+            self.statement(statement)
+
+        self.end()
+        self.preamble()
+
+    def preamble(self):
+        # The header is only written out at the end, so what the statements required can still go first
+        self.emitter.header[:0] = [line + "\n" for line in sorted(self.requires)]
+
+    def block(self, body):
+        self.emitter.scope += 1
+
+        for statement in body:
+            self.statement(statement)
+
+        self.emitter.scope -= 1
+
+    def expression(self, node, precedence=0) -> str:
+        match node:
+            case Number(text):
+                return text
+
+            case String(text):
+                return f'"{text}"'
+
+            case Boolean(value):
+                return self.true if value else self.false
+
+            case Name(name):
+                return name
+
+            case Index(name, index, arrayType):
+                return f"{name}[{self.offset(index, arrayType)}]"
+
+            case UnaryOp(op, operand):
+                text = op + self.expression(operand, UNARY_PRECEDENCE)
+                nodePrecedence = UNARY_PRECEDENCE
+
+            case BinOp(op, left, right):
+                nodePrecedence = PRECEDENCE[op]
+                left = self.expression(left, nodePrecedence)
+                text = f"{left} {self.operators.get(op, op)} {self.expression(right, nodePrecedence + 1)}"
+
+            case Convert(varType, value):
+                return f"{self.conversions[varType]}({self.expression(value)})"
+
+            case Compare(op, left, right):
+                nodePrecedence = 0
+                text = f"{self.expression(left, 1)} {op} {self.expression(right, 1)}"
+
+        if nodePrecedence < precedence:
+            return f"({text})"
+
+        return text
+
+    def offset(self, index, arrayType):
+        # Index into storage that starts at the array's lower bound
+        lower = arrayType.lower
+        if lower == 0:
+            return self.expression(index)
+
+        if isinstance(index, Number) and index.text.lstrip("-").isdigit():
+            return str(int(index.text) - lower)
+
+        return self.expression(BinOp("-", index, Number(str(lower))) if lower > 0 else BinOp("+", index, Number(str(-lower))))
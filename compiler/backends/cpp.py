@@ -0,0 +1,186 @@
+from nodes import *
+from backends import base
+
+NAME = "C++"
+OUTPUT = "out.cpp"
+LANGUAGE = "cpp"
+INCREMENTAL = True
+
+varMap = {
+    "INTEGER": "int",
+    "BOOLEAN": "bool",
+    "REAL": "float",
+    "STRING": "std::string",
+    "CHAR": "char"
+}
+
+# Bigger arrays get static storage instead of going on the stack
+STACK_BYTES = 1 << 16
+ELEMENT_BYTES = {"INTEGER": 4, "BOOLEAN": 1, "REAL": 4, "STRING": 32, "CHAR": 1}
+
+# Fast I/O runtime: INPUT reads through a buffer instead of std::cin, and flushes std::cout before it waits for
+# more input so anything OUTPUT so far shows first. Qualified names are safe from clashing with any variable.
+FAST_IO = '''#include <cctype>
+#include <cstdio>
+#include <cstdlib>
+#include <cstring>
+#include <string>
+
+namespace cie {
+    char buffer[1 << 16];
+    size_t pos = 0, len = 0;
+
+    int get() {
+        if (pos == len) {
+            std::cout.flush();
+            // fgets returns a line at a time from a terminal, but stdio still reads files in large blocks
+            if (!std::fgets(buffer, sizeof buffer, stdin)) return EOF;
+            pos = 0;
+            len = std::strlen(buffer);
+        }
+        return (unsigned char) buffer[pos++];
+    }
+
+    int skip() {
+        int c = get();
+        while (c != EOF && std::isspace(c)) c = get();
+        return c;
+    }
+
+    void unget(int c) {
+        if (c != EOF) pos--;
+    }
+
+    void read(std::string &value) {
+        value.clear();
+        int c = skip();
+        for (; c != EOF && !std::isspace(c); c = get()) value += (char) c;
+        unget(c);
+    }
+
+    void read(int &value) {
+        int c = skip();
+        bool negative = c == '-';
+        if (c == '-' || c == '+') c = get();
+
+        value = 0;
+        for (; c >= '0' && c <= '9'; c = get()) value = value * 10 + (c - '0');
+        unget(c);
+
+        if (negative) value = -value;
+    }
+
+    void read(float &value) {
+        std::string text;
+        read(text);
+        value = std::strtof(text.c_str(), nullptr);
+    }
+
+    void read(char &value) {
+        int c = skip();
+        value = c == EOF ? 0 : (char) c;
+    }
+}
+'''
+
+
+class Generator(base.Generator):
+    true = "true"
+    false = "false"
+    operators = {"//": "/"}  # INTEGER division is just / between ints
+    conversions = {"INTEGER": "static_cast<int>", "REAL": "static_cast<float>"}
+
+    def statement(self, node):
+        match node:
+            case Output(value):
+                end = "'\\n'" if self.fastIO else "std::endl"  # std::endl flushes every line
+                self.emitter.emitLine(f"std::cout << {self.expression(value)} << {end};")
+
+            case Input(name, varType, declares):
+                if declares:
+                    self.emitter.emitLine(f"{varMap[varType]} {name};")
+
+                self.emitter.emitLine(f"cie::read({name});" if self.fastIO else f"std::cin >> {name};")
+
+            case If(branches, orelse):
+                keyword = "if"
+                for condition, body in branches:
+                    self.emitter.emitLine(f"{keyword} ({self.expression(condition)}){{")
+                    self.block(body)
+                    keyword = "} else if"
+
+                if orelse is not None:
+                    self.emitter.emitLine("} else{")
+                    self.block(orelse)
+
+                self.emitter.emitLine("}\n")
+
+            case While(condition, body):
+                self.emitter.emitLine(f"while ({self.expression(condition)}){{")
+                self.block(body)
+                self.emitter.emitLine("}\n")
+
+            case Repeat(body, condition):
+                self.emitter.emitLine("do {")
+                self.block(body)
+                self.emitter.emitLine(f"}} while (!({self.expression(condition)}));")
+
+            case For(name, start, end, step, body, declares):
+                init = f"int {name}" if declares else name
+                increment = f"{name}++" if step is None else f"{name} += {self.expression(step)}"
+
+                self.emitter.emitLine(f"for ({init} = {self.expression(start)}; {name} < {self.expression(end)}; {increment}){{")
+                self.block(body)
+                self.emitter.emitLine("}\n")
+
+            case Block(body):
+                self.emitter.emitLine("{")
+                self.block(body)
+                self.emitter.emitLine("}")
+
+            case Declare(name, "INTEGER", None):
+                self.emitter.emitLine(f"int {name} = 0;")
+
+            case Declare(name, varType, None):
+                self.emitter.emitLine(f"{varMap[varType]} {name};")
+
+            case Declare(name, varType, arrayType):
+                self.requires.add("#include <array>")
+                declaration = f"std::array<{varMap[varType]}, {arrayType.length}> {name}{{}};"
+
+                if arrayType.length * ELEMENT_BYTES[varType] <= STACK_BYTES:
+                    self.emitter.emitLine(declaration)
+                else:
+                    self.emitter.emitLine(f"static {declaration}")
+                    if self.emitter.scope > 1:  # Static storage outlives the block, clear it on every pass instead
+                        self.emitter.emitLine(f"{name}.fill({{}});")
+
+            case IndexAssign(name, index, arrayType, value):
+                self.emitter.emitLine(f"{name}[{self.offset(index, arrayType)}] = {self.expression(value)};")
+
+            case Constant(name, value):
+                self.emitter.emitLine(f"const auto {name} = {self.expression(value)};")
+
+            case Assign(name, _, value):
+                self.emitter.emitLine(f"{name} = {self.expression(value)};")
+
+    def begin(self):
+        self.emitter.headerLine("#include <iostream>\n")
+        if self.fastIO:
+            self.emitter.headerLine(FAST_IO)
+
+        self.emitter.headerLine("int main(){")
+        self.emitter.scope += 1
+
+        if self.fastIO:
+            self.emitter.headerLine("std::ios::sync_with_stdio(false);")
+            self.emitter.headerLine("std::cin.tie(nullptr);\n")
+
+    def end(self):
+        if self.fastIO:
+            self.emitter.emitLine('std::cout.flush();')
+
+        self.emitter.emitLine('return 0;')
+        self.emitter.scope -= 1
+
+        self.emitter.emitLine('}')
@@ -0,0 +1,264 @@
+import ast
+import gc
+from nodes import *
+from backends import base, python
+
+# Python backend that builds an ast.Module directly instead of source text, so running in-process
+# (pyrun.py) hands the tree straight to compile() without CPython parsing generated text again.
+# Source is only produced for out.py, through ast.unparse. Statements carry their pseudocode line,
+# so tracebacks point into the original program.
+
+NAME = "Python (ast)"
+OUTPUT = "out.py"
+LANGUAGE = "python"
+INCREMENTAL = False  # Only whole programs are unparsed
+
+# Contexts and operators carry no state, so like CPython's own parser every node shares one instance
+LOAD = ast.Load()
+STORE = ast.Store()
+BINARY = {"+": ast.Add(), "-": ast.Sub(), "*": ast.Mult(), "/": ast.Div(), "//": ast.FloorDiv()}
+UNARY = {"+": ast.UAdd(), "-": ast.USub()}
+COMPARISONS = {"==": ast.Eq(), "!=": ast.NotEq(), "<": ast.Lt(), "<=": ast.LtE(), ">": ast.Gt(), ">=": ast.GtE()}
+CONVERSIONS = {"INTEGER": "int", "REAL": "float"}
+
+ARRAY_STORAGE = {"INTEGER": ("q", 0), "REAL": ("d", 0.0)}
+ARRAY_DEFAULTS = {"BOOLEAN": False, "STRING": "", "CHAR": ""}
+
+# The same runtimes and imports the text backend writes, parsed once
+FAST_IO = ast.parse(python.FAST_IO).body
+ARRAY_IMPORT = ast.parse("from array import array as _cie_array").body
+
+
+def location(line):
+    return {"lineno": line, "col_offset": 0, "end_lineno": line, "end_col_offset": 0}
+
+
+class Builder():
+    # Every node is located as it's created, at the line of the statement being built (self.at), which is
+    # much cheaper than a generic ast.fix_missing_locations pass over the finished tree
+    def __init__(self, fastIO=False) -> None:
+        self.fastIO = fastIO
+        self.requires = set()
+        self.at = location(1)
+        self.divisions = 0  # Divisions the expression being built is nested in
+
+    def load(self, name):
+        return ast.Name(name, LOAD, **self.at)
+
+    def store(self, name):
+        return ast.Name(name, STORE, **self.at)
+
+    def call(self, name, *args):
+        return ast.Call(self.load(name), list(args), [], **self.at)
+
+    def constant(self, value):
+        return ast.Constant(value, **self.at)
+
+    def module(self, program):
+        # The tree has no reference cycles, so there's nothing for the collector to do while it's built except
+        # repeatedly scan the ever growing number of new nodes
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            body = self.block(program.body)
+        finally:
+            if enabled:
+                gc.enable()
+
+        self.at = location(1)
+        body.append(ast.Return(None, **self.at))
+
+        main = ast.FunctionDef("main", ast.arguments([], [], None, [], [], None, []), body, [], None, **self.at)
+        start = ast.Expr(self.call("main"), **self.at)
+        if self.fastIO:  # Flush even if the program stops with an error
+            start = ast.Try([start], [], [], [ast.Expr(self.call("_cie_flush"), **self.at)], **self.at)
+
+        preamble = ARRAY_IMPORT if "array" in self.requires else []
+        if self.fastIO:
+            preamble = preamble + FAST_IO
+
+        return ast.Module(preamble + [main, start], [])
+
+    def block(self, body):
+        statements = []
+        for node in body:
+            statements += self.statement(node)
+
+        return statements or [ast.Pass(**self.at)]
+
+    def statement(self, node):
+        # List of ast statements for node, located at its line in the pseudocode
+        outer = self.at
+        self.at = at = location(node.line or 1)
+
+        statements = self.statements(node)
+        for statement in statements:  # Compound statements are only created after their bodies
+            statement.__dict__.update(at)
+
+        self.at = outer
+        return statements
+
+    def statements(self, node):
+        match node:
+            case Output(String(text)) if self.fastIO:
+                return [ast.Expr(self.call("_cie_output", self.string(text + "\\n")), **self.at)]
+
+            case Output(value) if self.fastIO:
+                parts = [ast.FormattedValue(self.expression(value), -1, None, **self.at), self.constant("\n")]
+                return [ast.Expr(self.call("_cie_output", ast.JoinedStr(parts, **self.at)), **self.at)]
+
+            case Output(value):
+                return [ast.Expr(self.call("print", self.expression(value)), **self.at)]
+
+            case Input(name, varType):
+                value = self.call("input", self.constant(""))
+                if varType in CONVERSIONS:
+                    value = self.call(CONVERSIONS[varType], value)
+
+                read = ast.Assign([self.store(name)], value, None, **self.at)
+                return [ast.Expr(self.call("_cie_flush"), **self.at), read] if self.fastIO else [read]
+
+            case If(branches, orelse):
+                tail = None if orelse is None else self.block(orelse)
+
+                for condition, body in reversed(branches):
+                    tail = [ast.If(self.expression(condition), self.block(body), tail or [], **self.at)]
+
+                return tail
+
+            case While(condition, body):
+                return [ast.While(self.expression(condition), self.block(body), [], **self.at)]
+
+            case Repeat(body, condition):
+                until = ast.If(self.expression(condition), [ast.Break(**self.at)], [], **self.at)
+                return [ast.While(self.constant(True), self.block(body) + [until], [], **self.at)]
+
+            case For(name, start, end, step, body):
+                bounds = [self.expression(start), self.expression(end)]
+                if step is not None:
+                    bounds.append(self.expression(step))
+
+                target = self.store(name)
+                return [ast.For(target, self.call("range", *bounds), self.block(body), [], None, **self.at)]
+
+            case Declare(name, varType, None):
+                return [ast.Assign([self.store(name)], self.constant(None), None, **self.at)]
+
+            case Declare(name, varType, arrayType):
+                if varType in ARRAY_STORAGE:
+                    self.requires.add("array")
+                    code, zero = ARRAY_STORAGE[varType]
+                    zeros = ast.List([self.constant(zero)], LOAD, **self.at)
+                    storage = self.call("_cie_array", self.constant(code), zeros)
+                else:
+                    storage = ast.List([self.constant(ARRAY_DEFAULTS[varType])], LOAD, **self.at)
+
+                value = ast.BinOp(storage, BINARY["*"], self.constant(arrayType.length), **self.at)
+                return [ast.Assign([self.store(name)], value, None, **self.at)]
+
+            case IndexAssign(name, index, arrayType, value):
+                target = ast.Subscript(self.load(name), self.offset(index, arrayType), STORE, **self.at)
+                return [ast.Assign([target], self.expression(value), None, **self.at)]
+
+            case Constant(name, value) | Assign(name, _, value):
+                return [ast.Assign([self.store(name)], self.expression(value), None, **self.at)]
+
+            case Block(body):  # Python has no block scope, the statements just go inline
+                statements = []
+                for statement in body:
+                    statements += self.statement(statement)
+
+                return statements
+
+    def expression(self, node):
+        match node:
+            case Number(text):
+                return self.constant(int(text) if text.lstrip("-").isdigit() else float(text))
+
+            case String(text):
+                return self.string(text)
+
+            case Boolean(value):
+                return self.constant(value)
+
+            case Name(name):
+                return self.load(name)
+
+            case Index(name, index, arrayType):
+                return ast.Subscript(self.load(name), self.offset(index, arrayType), LOAD, **self.at)
+
+            case UnaryOp(op, operand):
+                return ast.UnaryOp(UNARY[op], self.expression(operand), **self.at)
+
+            case BinOp("//", left, right):
+                return self.division(left, right)
+
+            case BinOp(op, left, right):
+                return ast.BinOp(self.expression(left), BINARY[op], self.expression(right), **self.at)
+
+            case Compare(op, left, right):
+                return ast.Compare(self.expression(left), [COMPARISONS[op]], [self.expression(right)], **self.at)
+
+            case Convert(varType, value):
+                return self.call(CONVERSIONS[varType], self.expression(value))
+
+    def division(self, left, right):
+        # INTEGER division truncating towards zero, inline, as python.Generator.division writes it
+        numerator, denominator = python.integer(left), python.integer(right)
+        if numerator is not None and numerator >= 0 and denominator is not None and denominator > 0:
+            return ast.BinOp(self.expression(left), BINARY["//"], self.expression(right), **self.at)
+
+        depth = self.divisions
+        self.divisions += 1
+        operands = []
+
+        for node, name in ((left, python.NUMERATOR), (right, python.DENOMINATOR)):
+            if python.cheap(node) or isinstance(node, Number):
+                operands.append((self.expression(node), lambda node=node: self.expression(node)))
+            else:  # Worked out once, in the test that comes first
+                test = ast.NamedExpr(self.store(f"{name}{depth}"), self.expression(node), **self.at)
+                operands.append((test, lambda name=f"{name}{depth}": self.load(name)))
+
+        self.divisions -= 1
+        (a, a2), (b, b2) = operands
+
+        if denominator is not None and denominator > 0:
+            test = ast.Compare(a, [COMPARISONS[">="]], [self.constant(0)], **self.at)
+        else:
+            test = ast.Compare(ast.Compare(a, [COMPARISONS[">="]], [self.constant(0)], **self.at), [COMPARISONS["=="]],
+                               [ast.Compare(b, [COMPARISONS[">"]], [self.constant(0)], **self.at)], **self.at)
+            b = b2()
+
+        negated = ast.UnaryOp(UNARY["-"], a2(), **self.at)
+        floor = ast.BinOp(a2(), BINARY["//"], b, **self.at)
+        truncated = ast.UnaryOp(UNARY["-"], ast.BinOp(negated, BINARY["//"], b2(), **self.at), **self.at)
+        return ast.IfExp(test, floor, truncated, **self.at)
+
+    def string(self, text):
+        # Pseudocode strings are written out as Python string literals, so escapes mean the same here
+        return self.constant(ast.literal_eval(f'"{text}"') if "\\" in text else text)
+
+    def offset(self, index, arrayType):
+        # Index into storage that starts at the array's lower bound, checked like python.Generator.offset
+        lower = arrayType.lower
+        if isinstance(index, Number) and index.text.lstrip("-").isdigit():
+            position = int(index.text) - lower
+            return self.constant(position if position >= 0 else arrayType.length)
+
+        if python.cheap(index):
+            test, position = self.expression(index), self.expression(index)
+        else:  # Worked out once
+            test = ast.NamedExpr(self.store(python.INDEX), self.expression(index), **self.at)
+            position = self.load(python.INDEX)
+
+        if lower != 0:
+            op = BINARY["-"] if lower > 0 else BINARY["+"]
+            position = ast.BinOp(position, op, self.constant(abs(lower)), **self.at)
+
+        test = ast.Compare(test, [COMPARISONS[">="]], [self.constant(lower)], **self.at)
+        return ast.IfExp(test, position, self.constant(arrayType.length), **self.at)
+
+
+class Generator(base.Generator):
+    def program(self, program):
+        self.emitter.emitLine(ast.unparse(Builder(self.fastIO).module(program)))
@@ -0,0 +1,215 @@
+from nodes import *
+from backends import base
+
+NAME = "Python"
+OUTPUT = "out.py"
+LANGUAGE = "python"
+INCREMENTAL = True  # Can generate code for any run of top-level statements on its own (see watch.py)
+
+# Preallocated storage for arrays: typed array.array for numbers, lists otherwise
+ARRAY_STORAGE = {
+    "INTEGER": "_cie_array('q', [0])",
+    "REAL": "_cie_array('d', [0.0])",
+    "BOOLEAN": "[False]",
+    "STRING": '[""]',
+    "CHAR": '[""]'
+}
+
+# Holds a computed array index while it's checked against the lower bound (see Generator.offset)
+INDEX = "_cie_index"
+
+# INTEGER division truncates towards zero like C++, where Python's own // rounds down. It's written out inline as
+# `a // b if (a >= 0) == (b > 0) else -(-a // b)`, with an operand that isn't a name or literal worked out once into
+# one of these, numbered by how deeply the division is nested in others (see Generator.division)
+NUMERATOR = "_cie_num"
+DENOMINATOR = "_cie_den"
+
+# Fast I/O runtime: OUTPUT appends to a buffer that's written out in large chunks, before every INPUT and at exit
+FAST_IO = '''import sys
+
+_cie_buffer = []
+
+
+def _cie_output(text):
+    _cie_buffer.append(text)
+    if len(_cie_buffer) >= 8192:
+        _cie_flush()
+
+
+def _cie_flush():
+    if _cie_buffer:
+        sys.stdout.write("".join(_cie_buffer))
+        _cie_buffer.clear()
+
+'''
+
+
+def cheap(index):
+    # Whether an index is simple enough to write out twice, once for the bounds check
+    return isinstance(index, Name) or isinstance(index, UnaryOp) and isinstance(index.operand, (Name, Number))
+
+
+def integer(node):
+    # The value of an INTEGER literal, or None
+    return int(node.text) if isinstance(node, Number) and node.text.lstrip("-").isdigit() else None
+
+
+class Generator(base.Generator):
+    def __init__(self, emitter, fastIO=False) -> None:
+        super().__init__(emitter, fastIO)
+        self.divisions = 0  # Divisions the expression being written is nested in
+
+    def block(self, body):
+        if not body:
+            body = [None]  # Python blocks can't be empty
+
+        super().block(body)
+
+    def statement(self, node):
+        match node:
+            case None:
+                self.emitter.emitLine("pass")
+
+            case Output(String(text)) if self.fastIO:
+                self.emitter.emitLine(f'_cie_output("{text}\\n")')
+
+            case Output(value) if self.fastIO:
+                self.emitter.emitLine(f'_cie_output(f"{{{self.expression(value)}}}\\n")')
+
+            case Output(value):
+                self.emitter.emitLine(f"print({self.expression(value)})")
+
+            case Input(name, varType):
+                if self.fastIO:
+                    self.emitter.emitLine("_cie_flush()")  # Anything OUTPUT so far has to show before the program waits
+
+                match varType:
+                    case "INTEGER":
+                        self.emitter.emitLine(f"{name} = int(input(''))")
+
+                    case "REAL":
+                        self.emitter.emitLine(f"{name} = float(input(''))")
+
+                    case _:
+                        self.emitter.emitLine(f"{name} = input('')")
+
+            case If(branches, orelse):
+                keyword = "if"
+                for condition, body in branches:
+                    self.emitter.emitLine(f"{keyword} ({self.expression(condition)}):")
+                    self.block(body)
+                    keyword = "elif"
+
+                if orelse is not None:
+                    self.emitter.emitLine("else:")
+                    self.block(orelse)
+
+                self.emitter.emitLine("")
+
+            case While(condition, body):
+                self.emitter.emitLine(f"while ({self.expression(condition)}):")
+                self.block(body)
+                self.emitter.emitLine("")
+
+            case Repeat(body, condition):
+                self.emitter.emitLine("while True:")
+                self.emitter.scope += 1
+
+                for statement in body:
+                    self.statement(statement)
+
+                self.emitter.emitLine(f"if ({self.expression(condition)}):")
+                self.emitter.emitLine("break", self.emitter.scope + 1)
+                self.emitter.scope -= 1
+                self.emitter.emitLine("")
+
+            case For(name, start, end, step, body):
+                bounds = f"{self.expression(start)}, {self.expression(end)}"
+                if step is not None:
+                    bounds += f", {self.expression(step)}"
+
+                self.emitter.emitLine(f"for {name} in range({bounds}):")
+                self.block(body)
+                self.emitter.emitLine("")
+
+            case Block(body):  # Python has no block scope, the statements just go inline
+                for statement in body:
+                    self.statement(statement)
+
+            case Declare(name, varType, None):
+                self.emitter.emitLine(f"{name} = None  # Type {varType}")
+
+            case Declare(name, varType, arrayType):
+                if varType in ("INTEGER", "REAL"):
+                    self.requires.add("from array import array as _cie_array\n")
+
+                self.emitter.emitLine(f"{name} = {ARRAY_STORAGE[varType]} * {arrayType.length}  # Type {arrayType}")
+
+            case IndexAssign(name, index, arrayType, value):
+                self.emitter.emitLine(f"{name}[{self.offset(index, arrayType)}] = {self.expression(value)}")
+
+            case Constant(name, value) | Assign(name, _, value):
+                self.emitter.emitLine(f"{name} = {self.expression(value)}")
+
+    def expression(self, node, precedence=0):
+        if isinstance(node, BinOp) and node.op == "//":
+            return self.division(node.left, node.right, precedence)
+
+        return super().expression(node, precedence)
+
+    def division(self, left, right, precedence):
+        # INTEGER division truncating towards zero, inline. Python's // already does when both sides are known to be
+        # non-negative, and only the left side's sign needs testing when the right is a positive literal.
+        numerator, denominator = integer(left), integer(right)
+        if numerator is not None and numerator >= 0 and denominator is not None and denominator > 0:
+            return super().expression(BinOp("//", left, right), precedence)
+
+        depth = self.divisions
+        self.divisions += 1
+        operands = []
+
+        for node, name in ((left, NUMERATOR), (right, DENOMINATOR)):
+            if cheap(node) or isinstance(node, Number):
+                text = self.expression(node, base.UNARY_PRECEDENCE)
+                operands.append((text, text))
+            else:  # Worked out once, in the test that comes first
+                operands.append((f"({name}{depth} := {self.expression(node)})", f"{name}{depth}"))
+
+        self.divisions -= 1
+        (a, a2), (b, b2) = operands
+
+        if denominator is not None and denominator > 0:
+            return f"({a2} // {b} if {a} >= 0 else -(-{a2} // {b}))"
+
+        return f"({a2} // {b2} if ({a} >= 0) == ({b} > 0) else -(-{a2} // {b2}))"
+
+    def offset(self, index, arrayType):
+        # Like base.Generator.offset, but an index below the lower bound goes past the end of the storage rather than
+        # wrapping round to count back from it, so it raises IndexError just like one above the upper bound
+        if isinstance(index, Number) and index.text.lstrip("-").isdigit():
+            position = int(index.text) - arrayType.lower
+            return str(position if position >= 0 else arrayType.length)
+
+        if cheap(index):
+            test = self.expression(index)
+        else:  # Worked out once
+            test = f"({INDEX} := {self.expression(index)})"
+            index = Name(INDEX, "INTEGER")
+
+        return f"{super().offset(index, arrayType)} if {test} >= {arrayType.lower} else {arrayType.length}"
+
+    def begin(self):
+        if self.fastIO:
+            self.emitter.headerLine(FAST_IO)
+
+        self.emitter.headerLine("def main():")
+        self.emitter.scope += 1
+
+    def end(self):
+        self.emitter.emitLine('return')
+        self.emitter.scope -= 1
+
+        if self.fastIO:  # Flush even if the program stops with an error
+            self.emitter.emitLine('\ntry:\n    main()\nfinally:\n    _cie_flush()')
+        else:
+            self.emitter.emitLine('\nmain()')
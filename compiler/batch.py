@@ -0,0 +1,105 @@
+import fnmatch
+import multiprocessing
+import os
+import sys
+import time
+import cache
+import driver
+
+# Batch mode: compile many pseudocode files in parallel across a process pool.
+
+
+def collect(paths, pattern, outDir):
+    # Expand directories (recursively, files matching pattern) into (source, output directory) jobs.
+    # With an output directory, files found under a directory keep their relative layout inside it.
+    jobs = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(fnmatch.filter(files, pattern)):
+                    directory = None if outDir is None else os.path.join(outDir, os.path.relpath(root, path))
+                    jobs.append((os.path.join(root, name), directory))
+        else:
+            jobs.append((path, outDir))
+
+    return jobs
+
+
+def compileOne(job):
+    path, outDir, targets, useCache, level, fastIO, instrument, maxErrors = job
+    start = time.perf_counter()
+
+    try:
+        selected = driver.loadBackends(targets)
+        if outDir is not None:
+            os.makedirs(outDir, exist_ok=True)
+
+        outputs = [(backend, driver.outputPath(backend, path, outDir)) for backend in selected]
+        if instrument:
+            import timings
+            report = timings.measure(path, outputs, level, fastIO)
+            return path, None, report["lines"], time.perf_counter() - start, report
+
+        compileCache = cache.CompileCache() if useCache else None
+        lines = driver.compileFile(path, outputs, compileCache, level, fastIO, maxErrors)
+        return path, None, lines, time.perf_counter() - start, None
+
+    except SystemExit as error:  # Compile errors abort through sys.exit
+        return path, str(error.code), 0, time.perf_counter() - start, None
+
+    except OSError as error:
+        return path, str(error), 0, time.perf_counter() - start, None
+
+    except Exception as error:  # A bug, or e.g. a RecursionError on a huge expression: only this file fails
+        return path, f"Internal error: {type(error).__name__}: {error}", 0, time.perf_counter() - start, None
+
+
+def run(paths, targets, outDir=None, jobs=None, pattern="*.txt", useCache=True, level=0, fastIO=False,
+        showTimings=False, timingsJson=None, maxErrors=1):
+    # With showTimings or timingsJson, every file is compiled through timings.measure (bypassing the cache)
+    driver.loadBackends(targets)  # Reject unknown targets before starting any workers
+    instrument = showTimings or timingsJson is not None
+    work = [(path, directory, targets, useCache, level, fastIO, instrument, maxErrors)
+            for path, directory in collect(paths, pattern, outDir)]
+
+    if not work:
+        sys.exit("No input files found.")
+
+    jobs = min(jobs or os.cpu_count() or 1, len(work))
+    print(f"Compiling {len(work)} files with {jobs} workers.")
+
+    failed = 0
+    lines = 0
+    reports = []
+    start = time.perf_counter()
+
+    with multiprocessing.Pool(jobs) as pool:
+        chunksize = max(1, min(64, len(work) // (jobs * 8)))
+
+        for path, error, count, elapsed, report in pool.imap_unordered(compileOne, work, chunksize):
+            if error is None:
+                lines += count
+                print(f"ok      {path} ({elapsed * 1000:.1f} ms)")
+            else:
+                failed += 1
+                print(f"FAILED  {path}: {error}")
+
+            if report is not None:
+                reports.append(report)
+                if showTimings:
+                    import timings
+                    print("\n".join(timings.describe(report)))
+
+    elapsed = time.perf_counter() - start
+    if timingsJson is not None:
+        import timings
+        timings.save(reports, timingsJson)
+
+    if useCache and not instrument:
+        cache.CompileCache().trim(force=True)
+
+    print(f"{len(work) - failed}/{len(work)} files compiled, {failed} failed, in {elapsed:.2f}s "
+          f"({len(work) / elapsed:.1f} files/s, {lines / elapsed:,.0f} lines/s)")
+
+    return failed == 0
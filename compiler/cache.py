@@ -0,0 +1,159 @@
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+
+# Content-addressed on-disk cache. Entries are files named by a hash of everything that determines
+# them (source text, target, options and the compiler itself), stored under <root>/<kind>/xx/yyyy...
+# Reading an entry bumps its mtime, and trim() evicts least recently used entries past the size cap.
+
+COMPILER_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def defaultRoot():
+    if os.environ.get("CIE_CACHE_DIR"):
+        return os.environ["CIE_CACHE_DIR"]
+
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "cie-compiler")
+
+
+def compilerFingerprint():
+    # Size and mtime of the compiler's modules, so editing or upgrading the compiler never serves stale
+    # entries. Covers every backend, loaded or not, and whichever other compiler modules are imported;
+    # the directory isn't just walked since generated files like out.py may sit next to the modules.
+    digest = hashlib.sha256()
+    paths = []
+
+    for name, module in sys.modules.items():
+        path = getattr(module, "__file__", None)
+        if path is not None and path.startswith(COMPILER_DIR) and name not in ("__main__", "__mp_main__") \
+                and not name.startswith("backends"):
+            paths.append(path)
+
+    backends = os.path.join(COMPILER_DIR, "backends")
+    paths += [os.path.join(backends, name) for name in os.listdir(backends) if name.endswith(".py")]
+
+    for path in sorted(paths):
+        info = os.stat(path)
+        digest.update(f"{os.path.relpath(path, COMPILER_DIR)}:{info.st_size}:{info.st_mtime_ns};".encode())
+
+    return digest.hexdigest()
+
+
+class CompileCache():
+    def __init__(self, kind="out", root=None, maxBytes=64 << 20) -> None:
+        self.root = os.path.join(root or defaultRoot(), kind)
+        self.maxBytes = maxBytes
+        self.stored = False  # Whether put() has added anything that trim() may need to make room for
+
+    def key(self, source, *parts):
+        digest = hashlib.sha256()
+        digest.update(compilerFingerprint().encode())
+        for part in parts:
+            digest.update(f"\0{part}".encode())
+
+        digest.update(b"\0\0")
+        digest.update(source.encode() if isinstance(source, str) else source)
+        return digest.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.root, key[:2], key[2:])
+
+    def get(self, key):
+        # Path of the entry, or None on a miss
+        path = self.path(key)
+
+        try:
+            os.utime(path)  # Mark as recently used
+        except FileNotFoundError:
+            return None
+
+        return path
+
+    def put(self, key, file, mode=None):
+        # Copy file into the cache
+        with open(file, 'rb') as f:
+            return self.store(key, lambda out: shutil.copyfileobj(f, out), mode)
+
+    def putBytes(self, key, data):
+        return self.store(key, lambda out: out.write(data))
+
+    def store(self, key, write, mode=None):
+        # Entries are written to a temp name first so concurrent readers never see half an entry
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        fd, temp = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, 'wb') as out:
+            write(out)
+
+        if mode is not None:  # e.g. executables, which mkstemp's 0600 would make unrunnable
+            os.chmod(temp, mode)
+
+        os.replace(temp, path)
+        self.stored = True
+        return path
+
+    def trim(self, force=False):
+        # Evict least recently used entries until the cache fits in maxBytes
+        if not self.stored and not force:
+            return
+
+        entries = []
+        total = 0
+        try:
+            buckets = os.scandir(self.root)
+        except FileNotFoundError:
+            return
+
+        with buckets:
+            for bucket in buckets:
+                if not bucket.is_dir():
+                    continue
+
+                with os.scandir(bucket.path) as files:
+                    for entry in files:
+                        info = entry.stat()
+                        entries.append((info.st_mtime_ns, info.st_size, entry.path))
+                        total += info.st_size
+
+        entries.sort()
+        for mtime, size, path in entries:
+            if total <= self.maxBytes:
+                break
+
+            try:
+                os.remove(path)
+            except FileNotFoundError:  # Another process evicted it first
+                pass
+            total -= size
+
+        self.stored = False
+
+
+def clearAll(root=None):
+    shutil.rmtree(root or defaultRoot(), ignore_errors=True)
+
+
+def sameContents(path, other):
+    if not os.path.exists(other) or os.path.getsize(path) != os.path.getsize(other):
+        return False
+
+    with open(path, 'rb') as a, open(other, 'rb') as b:
+        while True:
+            chunk = a.read(1 << 16)
+            if chunk != b.read(1 << 16):
+                return False
+            if not chunk:
+                return True
+
+
+def materialize(entry, output):
+    # Copy a cached entry to output, leaving output untouched (mtime included) if it's already identical
+    if sameContents(entry, output):
+        return False
+
+    shutil.copyfile(entry, output)
+    return True
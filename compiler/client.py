@@ -0,0 +1,103 @@
+import json
+import os
+import socket
+import sys
+
+# Thin client for the compile server (server.py). Takes the same arguments as a single-file
+# main.py run, e.g. `python3 compiler/client.py prog.txt py,cpp`, and only imports what it needs to
+# talk to the socket. When no server is running it falls back to compiling in-process.
+
+
+def socketPath():
+    if os.environ.get("CIE_SOCKET"):
+        return os.environ["CIE_SOCKET"]
+
+    return os.path.join(os.environ.get("XDG_RUNTIME_DIR") or os.environ.get("TMPDIR") or "/tmp", f"cie-compiler-{os.getuid()}.sock")
+
+
+def request(sock, message):
+    sock.sendall(json.dumps(message).encode() + b"\n")
+
+    data = b""
+    while not data.endswith(b"\n"):
+        chunk = sock.recv(65536)
+        if not chunk:
+            raise ConnectionError("Compile server closed the connection.")
+        data += chunk
+
+    return json.loads(data)
+
+
+def parseArgs(args):
+    # file [targets] [-O LEVEL] [--fast-io] [--no-cache] [--max-errors N], or None if that's not what was given
+    paths = []
+    level = 0
+    maxErrors = 1
+    args = iter(args)
+
+    for arg in args:
+        if arg == "--max-errors" or arg.startswith("--max-errors="):
+            count = next(args, "") if arg == "--max-errors" else arg.removeprefix("--max-errors=")
+            if not count.isdigit():
+                return None
+            maxErrors = int(count)
+            continue
+        elif arg in ("-O", "--optimize"):
+            arg = next(args, "")
+        elif arg.startswith(("-O", "--optimize=")):
+            arg = arg.removeprefix("-O").removeprefix("--optimize=")
+        elif arg in ("--no-cache", "--fast-io"):
+            continue
+        elif not arg.startswith("-"):
+            paths.append(arg)
+            continue
+        else:
+            return None
+
+        if arg not in ("0", "1", "2"):
+            return None
+        level = int(arg)
+
+    if len(paths) not in (1, 2):
+        return None
+
+    return paths, level, maxErrors
+
+
+def main():
+    args = sys.argv[1:]
+    parsed = parseArgs(args)
+
+    if parsed is None:
+        sys.exit("Usage: client.py file [targets] [-O LEVEL] [--fast-io] [--no-cache] [--max-errors N]")
+
+    paths, level, maxErrors = parsed
+
+    try:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(socketPath())
+    except (FileNotFoundError, ConnectionRefusedError):
+        # No server: behave exactly like main.py
+        import main as compiler
+        sys.argv = ["main.py"] + args
+        compiler.main()
+        return
+
+    with sock:
+        response = request(sock, {
+            "cwd": os.getcwd(),
+            "path": paths[0],
+            "targets": paths[1].split(",") if len(paths) > 1 else ["py"],
+            "cache": "--no-cache" not in args,
+            "level": level,
+            "fastIO": "--fast-io" in args,
+            "maxErrors": maxErrors,
+        })
+
+    print("CIE Pseudocode compiler by Opyu")
+    print(response["output"])
+    sys.exit(response["status"])
+
+
+if __name__ == "__main__":
+    main()
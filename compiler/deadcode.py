@@ -0,0 +1,297 @@
+import licm
+from nodes import *
+
+# Dead code elimination (-O1 and up), over a whole program. A liveness analysis works backwards through the
+# statements keeping the set of variables whose current value may still be read. An assignment to a variable
+# that isn't live (a dead store) is removed, and so is anything left with nothing in it: an IF, a FOR over its
+# own iterator, a Block. Loops go round until their live sets stop growing, since a value stored at the end of a
+# pass can be read at the start of the next. Finally, DECLAREs of variables nothing uses any more are removed.
+#
+# Only stores that can't fail go, so removing one never hides a runtime error: the value has no array reads, no
+# division except by a non-zero literal, no conversions except of a literal, and no variable that may still be
+# unassigned (None in Python) where it's read. An array element store also needs a literal index inside the
+# array's bounds. INPUT always stays, it consumes input even if the value's never read.
+# Runs on whole programs only, watch mode optimizes chunks of one on their own and can't see every use.
+
+
+def safe(node, unset=()):
+    # Whether evaluating the expression can't raise an error. unset: names that may not have a value yet.
+    match node:
+        case Number() | String() | Boolean():
+            return True
+
+        case Name(name):
+            return name not in unset
+
+        case UnaryOp(_, operand):
+            return safe(operand, unset)
+
+        case Convert(_, operand):  # int() of an infinite REAL fails
+            return isinstance(operand, Number)
+
+        case BinOp("/" | "//", left, Number(text)):
+            return float(text) != 0 and safe(left, unset)
+
+        case BinOp("+" | "-" | "*", left, right) | Compare(_, left, right):
+            return safe(left, unset) and safe(right, unset)
+
+    return False
+
+
+def inBounds(index, arrayType):
+    # Whether index is a literal inside the array's bounds
+    return isinstance(index, Number) and index.text.lstrip("-").isdigit() \
+        and arrayType.lower <= int(index.text) <= arrayType.upper
+
+
+def check(node, assigned, unset):
+    # Add to unset every name node reads that isn't in assigned
+    names = set()
+    licm.reads(node, names)
+    unset |= names - assigned
+
+
+def unassigned(body, assigned, unset):
+    # Go through body forwards, adding to unset every name read where it may not have been assigned yet.
+    # assigned: names certain to have a value before body; returns those certain to have one after it.
+    for node in body:
+        match node:
+            case Declare(name):
+                assigned.discard(name)
+
+            case Assign(name, _, value) | Constant(name, value):
+                check(value, assigned, unset)
+                assigned.add(name)
+
+            case IndexAssign(_, index, _, value):
+                check(index, assigned, unset)
+                check(value, assigned, unset)
+
+            case Input(name):
+                assigned.add(name)
+
+            case Output(value):
+                check(value, assigned, unset)
+
+            case If(branches, orelse):
+                after = None if orelse is None else unassigned(orelse, set(assigned), unset)
+                for condition, inner in branches:
+                    check(condition, assigned, unset)
+                    branch = unassigned(inner, set(assigned), unset)
+                    after = branch if after is None else after & branch
+
+                if orelse is not None:
+                    assigned = after
+
+            case While(condition, inner):  # Later passes start with at least as much assigned as the first
+                check(condition, assigned, unset)
+                unassigned(inner, set(assigned), unset)
+
+            case Repeat(inner, condition):
+                assigned = unassigned(inner, set(assigned), unset)
+                check(condition, assigned, unset)
+
+            case For(name, start, end, step, inner):
+                for bound in (start, end, step):
+                    check(bound, assigned, unset)
+
+                unassigned(inner, assigned | {name}, unset)
+
+            case Block(inner):
+                assigned = unassigned(inner, assigned, unset)
+
+    return assigned
+
+
+def references(body, names):
+    # Add every name body uses other than by DECLAREing it
+    for node in body:
+        match node:
+            case Assign(name) | IndexAssign(name) | Input(name) | Constant(name) | For(name):
+                names.add(name)
+
+        match node:
+            case If(branches, orelse):
+                for condition, inner in branches:
+                    licm.reads(condition, names)
+                    references(inner, names)
+
+                if orelse is not None:
+                    references(orelse, names)
+
+            case While(condition, inner) | Repeat(inner, condition):
+                licm.reads(condition, names)
+                references(inner, names)
+
+            case For(_, start, end, step, inner):
+                licm.reads(start, names)
+                licm.reads(end, names)
+                licm.reads(step, names)
+                references(inner, names)
+
+            case Block(inner):
+                references(inner, names)
+
+            case _:
+                licm.reads(node, names)
+
+
+class DeadCode():
+    def __init__(self, log=None) -> None:
+        self.log = log  # Told about everything removed, if given
+        self.removed = []  # (line, what was removed)
+        # (body, names live after it) -> names live before it, for the analysis without removing. A loop nested in
+        # n others would otherwise be analyzed exponentially many times in n, once per pass of each outer fixpoint.
+        self.memo = {}
+        self.unset = set()  # Names read anywhere they may not have a value yet
+
+    def program(self, program):
+        unassigned(program.body, set(), self.unset)
+        self.live(program.body, set(), True)
+        self.memo.clear()
+
+        names = set()
+        references(program.body, names)
+        self.declarations(program.body, names)
+
+        if self.log is not None:
+            for line, what in sorted(self.removed):
+                self.log(f"Line {line}: removed {what}")
+
+        return program
+
+    def remove(self, node, what):
+        self.removed.append((node.line, what))
+
+    def live(self, body, live, remove):
+        # Names live before body runs, given those live after it. With remove, what's dead is taken out of body.
+        if remove:
+            return self.sweep(body, live, True)
+
+        key = (id(body), frozenset(live))
+        if key not in self.memo:
+            self.memo[key] = frozenset(self.sweep(body, live, False))
+
+        return set(self.memo[key])
+
+    def sweep(self, body, live, remove):
+        live = set(live)
+        kept = []
+
+        for node in reversed(body):
+            match node:
+                case Assign(name, _, value) | Constant(name, value):
+                    if name not in live and safe(value, self.unset):
+                        if remove and isinstance(node, Constant):
+                            self.remove(node, f"unused CONSTANT {name}")
+                        elif remove:
+                            self.remove(node, f"assignment to '{name}', the value is never used")
+                        continue
+
+                    live.discard(name)
+                    licm.reads(value, live)
+
+                case IndexAssign(name, index, arrayType, value):
+                    if name not in live and inBounds(index, arrayType) and safe(value, self.unset):
+                        if remove:
+                            self.remove(node, f"assignment to '{name}[...]', the array is never read after it")
+                        continue
+
+                    licm.reads(index, live)
+                    licm.reads(value, live)
+
+                case Input(name) | Declare(name):
+                    live.discard(name)
+
+                case Output(value):
+                    licm.reads(value, live)
+
+                case If(branches, orelse):
+                    after = live
+                    live = set(after) if orelse is None else self.live(orelse, after, remove)
+                    for condition, inner in branches:
+                        live |= self.live(inner, after, remove)
+
+                    if remove and not any(inner for _, inner in branches) and not orelse \
+                            and all(safe(condition, self.unset) for condition, _ in branches):
+                        self.remove(node, "IF with nothing left in it")
+                        live = after
+                        continue
+
+                    for condition, _ in branches:
+                        licm.reads(condition, live)
+
+                case While(condition, inner):
+                    start = set(live)
+                    licm.reads(condition, start)
+                    live = self.loop(lambda head: start | self.live(inner, head, False), start)
+                    if remove:
+                        self.live(inner, live, True)
+
+                case Repeat(inner, condition):
+                    after = set(live)
+                    licm.reads(condition, after)
+                    # Live at the end of the body: whatever's live after the loop or at the start of the next pass
+                    end = self.loop(lambda end: after | self.live(inner, end, False), after)
+                    live = self.live(inner, end, remove)
+
+                case For(name, start, end, step, inner, declares):
+                    after = live
+                    live = self.loop(lambda head: after | self.live(inner, head, False), set(after))
+                    if remove:
+                        self.live(inner, live, True)
+
+                        if not inner and declares and safe(start, self.unset) and safe(end, self.unset) \
+                                and (step is None or isinstance(step, Number) and float(step.text) != 0):
+                            self.remove(node, f"FOR loop over '{name}' with nothing left in it")
+                            live = after
+                            continue
+
+                    licm.reads(start, live)
+                    licm.reads(end, live)
+                    licm.reads(step, live)
+
+                case Block(inner):
+                    live = self.live(inner, live, remove)
+                    if remove and not inner:
+                        continue
+
+            kept.append(node)
+
+        if remove:
+            body[:] = reversed(kept)
+
+        return live
+
+    def loop(self, step, live):
+        # Grow a loop's live set until it stops changing
+        while True:
+            grown = step(live)
+            if grown == live:
+                return live
+
+            live = grown
+
+    def declarations(self, body, names):
+        # Take out DECLAREs of names that aren't in names
+        kept = []
+
+        for node in body:
+            match node:
+                case Declare(name) if name not in names:
+                    self.remove(node, f"unused DECLARE {name}")
+                    continue
+
+                case If(branches, orelse):
+                    for _, inner in branches:
+                        self.declarations(inner, names)
+
+                    if orelse is not None:
+                        self.declarations(orelse, names)
+
+                case While(_, inner) | Repeat(inner) | For(_, _, _, _, inner) | Block(inner):
+                    self.declarations(inner, names)
+
+            kept.append(node)
+
+        body[:] = kept
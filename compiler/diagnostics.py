@@ -0,0 +1,60 @@
+import sys
+
+# Error recovery, for reporting every error in a file in one go (--max-errors). Normally the lexer and parser
+# stop the compile at the first error with sys.exit. When they're given a Diagnostics instead, the lexer records
+# its errors and skips the bad character, and the parser raises a Diagnostic, which it records before skipping
+# to the next statement (Parser.recover). The type checker then records its errors in the same Diagnostics, so
+# they're all reported together. Nothing about a compile that has no errors changes.
+
+
+class Diagnostic(Exception):
+    def __init__(self, message, line, col, kind="Error") -> None:
+        super().__init__(message)
+        self.message = message
+        self.line = line
+        self.col = col  # None for errors about a whole statement, e.g. from the type checker
+        self.kind = kind  # "Error" or "Lexing error", like the messages without recovery
+
+    def __str__(self):
+        where = f"line {self.line}" if self.col is None else f"line {self.line}, col {self.col}"
+        return f"{self.kind} on {where}: {self.message}".replace("\n", "\\n")
+
+
+class StopParsing(Exception):
+    # Too many errors, or an error at the end of the file there's nothing after to recover in
+    pass
+
+
+class Diagnostics():
+    def __init__(self, maxErrors) -> None:
+        self.maxErrors = maxErrors
+        self.errors = []
+
+    def add(self, diagnostic):
+        if len(self.errors) >= self.maxErrors:  # Parsing stopped, and the type checker carried on with what it got
+            raise StopParsing()
+
+        last = self.errors[-1] if self.errors else None
+        if last is not None and last.kind == "Lexing error" and last.line == diagnostic.line \
+                and diagnostic.kind != "Lexing error":
+            return  # The parser tripping over what's left of a line with bad characters in it
+
+        self.errors.append(diagnostic)
+
+        if len(self.errors) >= self.maxErrors:
+            raise StopParsing()
+
+    def check(self):
+        # Abort the compile with every error found, if there were any
+        if not self.errors:
+            return
+
+        summary = f"{len(self.errors)} error{'s' if len(self.errors) > 1 else ''}"
+        if len(self.errors) >= self.maxErrors:
+            summary = f"Stopped after {summary}."
+        else:
+            summary += "."
+
+        # The lexer runs a token ahead of the parser, so errors aren't always found in order
+        errors = sorted(self.errors, key=lambda error: (error.line, error.col or 0))
+        sys.exit("\n".join([str(error) for error in errors] + [summary]))
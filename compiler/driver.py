@@ -0,0 +1,129 @@
+import mmap
+import os
+import cache
+from lex import *
+from parser import *
+from emit import *
+from typecheck import *
+import backends
+
+# The compile pipeline shared by main.py and the batch/server front ends.
+
+VERSION = "0.4.0"
+
+LEVELS = (0, 1, 2)  # Optimization levels, see optimize.py
+
+# Files at least this big are memory-mapped and lexed in place (FileLexer) instead of read into a string
+MMAP_BYTES = 16 << 20
+
+# Sources at least this big are lexed in parallel when asked to (lexJobs), smaller ones lex faster than a pool starts
+PARALLEL_LEX_CHARS = 1 << 20
+
+
+def loadBackends(targets):
+    selected = []
+    for target in targets:
+        backend = backends.load(target)
+        if backend not in selected:
+            selected.append(backend)
+
+    return selected
+
+
+def outputPath(backend, sourcePath, outDir=None):
+    # prog.txt -> prog.py / prog.cpp, next to the source unless an output directory is given
+    stem = os.path.splitext(sourcePath)[0]
+    if outDir is not None:
+        stem = os.path.join(outDir, os.path.basename(stem))
+
+    return stem + os.path.splitext(backend.OUTPUT)[1]
+
+
+def parse(source, level=0, maxErrors=1, lexJobs=1, log=None):
+    # source is a str, or bytes-like (e.g. a mapped file) for FileLexer.
+    # With maxErrors above 1, errors are collected (up to that many) and all reported at the end of the parse.
+    # With lexJobs above 1, a big str source is lexed up front by that many processes (see parlex.py).
+    # log, if given, is told about the dead code the optimizer removes
+    lexer = Lexer if isinstance(source, str) else FileLexer
+    if lexJobs > 1 and maxErrors <= 1 and lexer is Lexer and len(source) >= PARALLEL_LEX_CHARS:
+        import parlex
+        buffer = parlex.tokenize(source, lexJobs)
+        if buffer is not None:  # Otherwise there's a lexing error, reported by lexing as usual below
+            return analyze(Parser(buffer).program(), level, log)
+
+    if maxErrors <= 1:
+        return analyze(Parser(lexer(source)).program(), level, log)
+
+    diagnostics = Diagnostics(maxErrors)
+    program = Parser(lexer(source, diagnostics=diagnostics), diagnostics=diagnostics).program()
+    return analyze(program, level, log, diagnostics)
+
+
+def analyze(program, level, log=None, diagnostics=None):
+    # The passes between parsing and code generation. With diagnostics, the type errors are reported together with
+    # whatever parsing found.
+    program = TypeChecker(diagnostics=diagnostics).program(program)
+    if diagnostics is not None:
+        diagnostics.check()
+
+    if level == 0:  # The optimizer and its passes aren't even imported
+        return program
+
+    from optimize import Optimizer
+    return Optimizer(level, log=log).program(program)
+
+
+def generate(program, backend, path, fastIO=False):
+    emitter = Emitter(path)
+    backend.Generator(emitter, fastIO).program(program)
+    emitter.writeFile()
+
+
+def lineCount(source):
+    if isinstance(source, str):
+        return source.count("\n") + 1
+
+    lines = 1
+    for start in range(0, len(source), MMAP_BYTES):  # A slice at a time, mapped files aren't counted in one go
+        lines += source[start : start + MMAP_BYTES].count(b"\n")
+
+    return lines
+
+
+def compileFile(path, outputs, compileCache=None, level=0, fastIO=False, maxErrors=1, lexJobs=1, log=None):
+    # outputs: (backend, output path) pairs, all generated from one parse.
+    # With a cache, targets whose output is cached are copied out without lexing or parsing anything.
+    # Lexing in parallel needs the source in memory, so lexJobs above 1 trades the mapping's memory savings for speed
+    if lexJobs <= 1 and os.path.getsize(path) >= MMAP_BYTES:
+        with open(path, 'rb') as i, mmap.mmap(i.fileno(), 0, access=mmap.ACCESS_READ) as source:
+            return compileSource(source, outputs, compileCache, level, fastIO, maxErrors, log=log)
+
+    with open(path, 'r') as i:
+        source = i.read()
+
+    return compileSource(source, outputs, compileCache, level, fastIO, maxErrors, lexJobs, log)
+
+
+def compileSource(source, outputs, compileCache, level, fastIO, maxErrors, lexJobs=1, log=None):
+    pending = []
+    for backend, output in outputs:
+        if compileCache is None:
+            pending.append((backend, output, None))
+            continue
+
+        key = compileCache.key(source, VERSION, backend.NAME, f"O{level}", f"fastIO={fastIO}")
+        entry = compileCache.get(key)
+        if entry is None:
+            pending.append((backend, output, key))
+        else:
+            cache.materialize(entry, output)
+
+    if pending:
+        program = parse(source, level, maxErrors, lexJobs, log)
+
+        for backend, output, key in pending:
+            generate(program, backend, output, fastIO)
+            if key is not None:
+                compileCache.put(key, output)
+
+    return lineCount(source)
@@ -1,27 +1,63 @@
+import shutil
+import tempfile
+
+
 class Emitter:
-    def __init__(self, file):
+    # Code is collected as a list of chunks rather than one growing string. Every flushChunks pieces the
+    # chunks are joined and moved into a spooled temp file, which stays in memory up to spoolSize chars
+    # and then rolls over to disk, so memory use stays bounded however large the output gets.
+    # The output file itself is only opened and written once, by writeFile().
+    def __init__(self, file, flushChunks=4096, spoolSize=1 << 20):
         self.filePath = file
-        self.header = ""
-        self.code = ""
+        self.header = []
+        self.chunks = []
+        self.body = tempfile.SpooledTemporaryFile(max_size=spoolSize, mode="w+")
+        self.flushChunks = flushChunks
         self.scope = 0
+        self.indents = [""]  # indents[n] is the prefix for scope n, built once per depth
+
+    def indent(self, scope):
+        while scope >= len(self.indents):
+            self.indents.append(self.indents[-1] + "    ")
+
+        return self.indents[scope]
 
     def emit(self, code, scope=None):
         if scope == None:
-            self.code += self.scope * "    " + code
+            scope = self.scope
+
+        if scope and code:
+            self.chunks.append(self.indent(scope))
+        self.chunks.append(code)
 
-        else:
-            self.code += scope * "    " + code
+        if len(self.chunks) >= self.flushChunks:
+            self.flush()
 
     def emitLine(self, code, scope=None):
-        if scope == None:
-            self.code += self.scope * "    " + code + "\n"
+        self.emit(code, scope)
+        self.chunks.append("\n")
+
+    def flush(self):
+        self.body.write("".join(self.chunks))
+        self.chunks.clear()
 
-        else:
-            self.code += scope * "    " + code + "\n"
+    def getCode(self):
+        # Everything emitted so far, for callers that want the code in memory rather than in a file
+        self.flush()
+        self.body.seek(0)
+        code = "".join(self.header) + self.body.read()
+        self.body.seek(0, 2)
+        return code
 
     def writeFile(self):
+        self.flush()
+        self.body.seek(0)
+
         with open(self.filePath, 'w') as f:
-            f.write(self.header + self.code)
+            f.write("".join(self.header))
+            shutil.copyfileobj(self.body, f)
+
+        self.body.close()
 
     def headerLine(self, code):
-        self.header += self.scope * "    " + code + "\n"
\ No newline at end of file
+        self.header.append(self.indent(self.scope) + code + "\n")
@@ -0,0 +1,304 @@
+import ast
+import operator
+import sys
+from array import array
+from nodes import *
+from arith import divide
+
+# Runs a parsed program directly, without generating any code. Every statement and expression is compiled
+# once into a Python closure, so running the program is just calling closures: there's no tree walking or
+# matching on node types while it runs. Variables live in one list, each name at a fixed slot.
+#
+# The semantics are those of the Python backend (INTEGER / INTEGER truncates, FOR stops before its end value,
+# INPUT converts to the variable's type), so a program prints the same either way.
+
+
+ARITHMETIC = {"+": operator.add, "-": operator.sub, "*": operator.mul, "/": operator.truediv, "//": divide}
+COMPARISONS = {"==": operator.eq, "!=": operator.ne, "<": operator.lt, "<=": operator.le,
+               ">": operator.gt, ">=": operator.ge}
+CONVERSIONS = {"INTEGER": int, "REAL": float}
+
+ARRAY_STORAGE = {"INTEGER": ("q", 0), "REAL": ("d", 0.0)}
+ARRAY_DEFAULTS = {"BOOLEAN": False, "STRING": "", "CHAR": ""}
+
+
+class Fault(Exception):
+    # An error raised by the running program, with the line of the statement that caused it
+    def __init__(self, line, error) -> None:
+        super().__init__(f"Runtime error on line {line}: {type(error).__name__}: {error}")
+        self.line = line
+
+
+class Interpreter():
+    def __init__(self, program, fastIO=False) -> None:
+        self.fastIO = fastIO  # Collect OUTPUT and write it in large chunks, like the generated programs do
+        self.slots = {}  # Variable name -> index into memory
+        self.memory = []
+        self.buffer = []
+        self.main = self.block(program.body)
+
+    def run(self):
+        try:
+            self.main()
+        finally:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            sys.stdout.write("".join(self.buffer))
+            self.buffer.clear()
+
+    def slot(self, name):
+        if name not in self.slots:
+            self.slots[name] = len(self.memory)
+            self.memory.append(None)
+
+        return self.slots[name]
+
+    def block(self, body):
+        statements = [self.statement(node) for node in body]
+        lines = {statement: node.line for statement, node in zip(statements, body)}
+
+        def run():
+            # The try costs nothing until something goes wrong. The innermost block the error passes through
+            # knows which of its statements was running.
+            try:
+                for statement in statements:
+                    statement()
+            except Fault:
+                raise
+            except Exception as error:
+                raise Fault(lines[statement], error) from error
+
+        return run
+
+    def statement(self, node):
+        memory = self.memory
+
+        match node:
+            case Output(value):
+                value = self.expression(value)
+
+                if self.fastIO:
+                    buffer = self.buffer
+                    flush = self.flush
+
+                    def output():
+                        buffer.append(f"{value()}\n")
+                        if len(buffer) >= 8192:
+                            flush()
+                else:
+                    def output():
+                        print(value())
+
+                return output
+
+            case Input(name, varType):
+                slot = self.slot(name)
+                convert = CONVERSIONS.get(varType, str)
+                flush = self.flush  # Anything OUTPUT so far has to show before the program waits
+
+                def read():
+                    flush()
+                    memory[slot] = convert(input(''))
+
+                return read
+
+            case If(branches, orelse):
+                branches = [(self.expression(condition), self.block(body)) for condition, body in branches]
+                orelse = None if orelse is None else self.block(orelse)
+
+                if len(branches) == 1:
+                    (condition, body), = branches
+
+                    if orelse is None:
+                        def choose():
+                            if condition():
+                                body()
+                    else:
+                        def choose():
+                            if condition():
+                                body()
+                            else:
+                                orelse()
+
+                    return choose
+
+                def choose():
+                    for condition, body in branches:
+                        if condition():
+                            return body()
+
+                    if orelse is not None:
+                        orelse()
+
+                return choose
+
+            case While(condition, body):
+                condition = self.expression(condition)
+                body = self.block(body)
+
+                def loop():
+                    while condition():
+                        body()
+
+                return loop
+
+            case Repeat(body, condition):
+                body = self.block(body)
+                condition = self.expression(condition)
+
+                def loop():
+                    while True:
+                        body()
+                        if condition():
+                            break
+
+                return loop
+
+            case For(name, start, end, step, body):
+                slot = self.slot(name)
+                start = self.expression(start)
+                end = self.expression(end)
+                step = self.constant(1) if step is None else self.expression(step)
+                body = self.block(body)
+
+                def loop():
+                    for value in range(start(), end(), step()):
+                        memory[slot] = value
+                        body()
+
+                return loop
+
+            case Block(body):
+                return self.block(body)
+
+            case Declare(name, varType, None):
+                slot = self.slot(name)
+
+                def declare():
+                    memory[slot] = None
+
+                return declare
+
+            case Declare(name, varType, arrayType):
+                slot = self.slot(name)
+                length = arrayType.length
+
+                if varType in ARRAY_STORAGE:
+                    code, zero = ARRAY_STORAGE[varType]
+                    storage = array(code, [zero])
+                else:
+                    storage = [ARRAY_DEFAULTS[varType]]
+
+                def declare():
+                    memory[slot] = storage * length
+
+                return declare
+
+            case IndexAssign(name, index, arrayType, value):
+                slot = self.slot(name)
+                index = self.offset(index, arrayType)
+                value = self.expression(value)
+
+                def store():
+                    memory[slot][index()] = value()
+
+                return store
+
+            case Constant(name, value) | Assign(name, _, value):
+                slot = self.slot(name)
+                value = self.expression(value)
+
+                def assign():
+                    memory[slot] = value()
+
+                return assign
+
+    def expression(self, node):
+        memory = self.memory
+
+        match node:
+            case Number(text):
+                return self.constant(int(text) if text.lstrip("-").isdigit() else float(text))
+
+            case String(text):
+                # Pseudocode strings are written out as Python string literals, so escapes mean the same here
+                return self.constant(ast.literal_eval(f'"{text}"') if "\\" in text else text)
+
+            case Boolean(value):
+                return self.constant(value)
+
+            case Name(name):
+                slot = self.slot(name)
+                return lambda: memory[slot]
+
+            case Index(name, index, arrayType):
+                slot = self.slot(name)
+                index = self.offset(index, arrayType)
+                return lambda: memory[slot][index()]
+
+            case Convert(varType, value):
+                convert = CONVERSIONS[varType]
+                value = self.expression(value)
+                return lambda: convert(value())
+
+            case UnaryOp("-", operand):
+                operand = self.expression(operand)
+                return lambda: -operand()
+
+            case UnaryOp(_, operand):
+                operand = self.expression(operand)
+                return lambda: +operand()
+
+            case BinOp(op, left, right) | Compare(op, left, right):
+                function = ARITHMETIC[op] if isinstance(node, BinOp) else COMPARISONS[op]
+
+                # Variables and literals are by far the most common operands, read them without a call
+                match left, right:
+                    case Name(a), Name(b):
+                        a, b = self.slot(a), self.slot(b)
+                        return lambda: function(memory[a], memory[b])
+
+                    case Name(a), Number() | Boolean():
+                        a, b = self.slot(a), self.expression(right)()
+                        return lambda: function(memory[a], b)
+
+                    case Number() | Boolean(), Name(b):
+                        a, b = self.expression(left)(), self.slot(b)
+                        return lambda: function(a, memory[b])
+
+                left, right = self.expression(left), self.expression(right)
+                return lambda: function(left(), right())
+
+    def constant(self, value):
+        return lambda: value
+
+    def offset(self, index, arrayType):
+        # Index into storage that starts at the array's lower bound. Like the generated Python, an index below it
+        # goes past the end of the storage rather than wrapping round, so it raises IndexError.
+        lower, length = arrayType.lower, arrayType.length
+        if isinstance(index, Number) and index.text.lstrip("-").isdigit():
+            position = int(index.text) - lower
+            return self.constant(position if position >= 0 else length)
+
+        index = self.expression(index)
+
+        def position():
+            i = index() - lower
+            return i if i >= 0 else length
+
+        return position
+
+
+def run(program, fastIO=False):
+    # Run a parsed program in this process; returns the exit status
+    try:
+        Interpreter(program, fastIO).run()
+    except Fault as fault:
+        sys.stdout.flush()
+        print(fault, file=sys.stderr)
+        return 1
+
+    sys.stdout.flush()
+    return 0
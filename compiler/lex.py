@@ -1,6 +1,9 @@
+import array
 import enum
+import mmap
 import sys
 import re
+from diagnostics import *
 
 class TokenType(enum.Enum):
     EOF = -1
@@ -48,163 +51,321 @@ class TokenType(enum.Enum):
     CLOSE_SQ_BRAC = 302
 
 
+# Keyword lookup table, built once from TokenType instead of walking the enum for every identifier
+KEYWORDS = {kind.name: kind for kind in TokenType if kind.value > 100 and kind.value <= 200}
+
+# Single master pattern for the scanner. Each match skips leading whitespace and an optional comment,
+# then matches exactly one token. Group names are TokenType names so match.lastgroup gives the kind.
+TOKEN_PATTERN = re.compile(r"""
+    [ \t\r]*(?://[^\n]*)?
+    (?:
+        (?P<IDENT>[a-zA-Z_][a-zA-Z0-9_]*)
+      | (?P<NEWLINE>\n)
+      | (?P<BAD_NUMBER>[0-9]+\.(?![0-9]))
+      | (?P<NUMBER>[0-9]+(?:\.[0-9]+)?)
+      | "(?P<STRING>[^"]*)"
+      | (?P<LTEQ><=) | (?P<GTEQ>>=) | (?P<EQEQ>==) | (?P<NOTEQ>!=)
+      | (?P<LT><) | (?P<GT>>) | (?P<EQ>=)
+      | (?P<PLUS>\+) | (?P<MINUS>-) | (?P<ASTERISK>\*) | (?P<SLASH>/)
+      | (?P<COLON>:) | (?P<OPEN_SQ_BRAC>\[) | (?P<CLOSE_SQ_BRAC>\])
+      | (?P<EOF>\Z)
+    )
+""", re.VERBOSE)
+
+SKIP_PATTERN = re.compile(r"[ \t\r]*(?://[^\n]*)?")
+
+# The same patterns over bytes, for FileLexer
+BYTE_TOKEN_PATTERN = re.compile(TOKEN_PATTERN.pattern.encode(), re.VERBOSE)
+BYTE_SKIP_PATTERN = re.compile(SKIP_PATTERN.pattern.encode())
+
+GROUP_KINDS = {name: TokenType[name] for name in TOKEN_PATTERN.groupindex if name in TokenType.__members__}
+
+
 class Token():
-    def __init__(self, tokenText, tokenKind):
-        self.text = tokenText
-        self.kind = tokenKind
+    # Tokens keep offsets into the lexer's source rather than a copy of their text.
+    # The text slot is only filled when something asks for it (see __getattr__), except for identifiers,
+    # which are interned up front since they need their text for the keyword lookup anyway.
+    __slots__ = ("kind", "source", "start", "end", "line", "text")
+
+    def __init__(self, kind, source, start, end, line, text=None):
+        self.kind = kind
+        self.source = source
+        self.start = start
+        self.end = end
+        self.line = line
+
+        if text is not None:
+            self.text = text
+
+    def __getattr__(self, name):  # Only reached while the text slot is still empty
+        if name != "text":
+            raise AttributeError(name)
+
+        self.text = self.source[self.start : self.end]
+        return self.text
+
+    @property
+    def col(self):
+        return self.start - self.source.rfind("\n", 0, self.start)
 
 
 class Lexer():
-    def __init__(self, source) -> None:
+    BLANK = " \t\r\n"
+
+    def __init__(self, source, line=1, diagnostics=None) -> None:
         self.source = source + "\n"  # Code to be compiled
-        self.char = ''
-        self.ptr = -1  # Pointer to current char
-        self.nextChar()
-        pass
+        self.ptr = 0  # Pointer to the next char to be scanned
+        self.line = line  # Line number of the source's first line
+        self.diagnostics = diagnostics  # Record errors here and lex on past them, instead of exiting on the first
 
     def checkKeyword(self, tokenText):
-        for kind in TokenType:
-            if kind.name == tokenText and kind.value > 100 and kind.value <= 200:
-                return kind
+        return KEYWORDS.get(tokenText)
 
-        return None
+    def getToken(self):
+        match = TOKEN_PATTERN.match(self.source, self.ptr)
+
+        while match is None:
+            self.unknownToken()  # Only returns when recovering, having skipped the bad character
+            match = TOKEN_PATTERN.match(self.source, self.ptr)
+
+        self.ptr = match.end()
+        name = match.lastgroup
+        kind = GROUP_KINDS.get(name)
+        start, end = match.span(name)
+
+        match(kind):
+            case TokenType.IDENT:
+                tokText = sys.intern(self.source[start : end])
+                return Token(KEYWORDS.get(tokText, kind), self.source, start, end, self.line, tokText)
+
+            case TokenType.NEWLINE:
+                self.line += 1
+                return Token(kind, self.source, start, end, self.line - 1)
+
+            case TokenType.STRING:
+                line = self.line
+                self.line += self.source.count("\n", start, end)
+                return Token(kind, self.source, start, end, line)
+
+            case TokenType.EOF:
+                end, line = self.lastLine(start)
+                return Token(kind, self.source, end, end, line, '\0')
+
+            case None:  # BAD_NUMBER
+                self.abort("Illegal character in number", start)
+                return self.getToken()
+
+        return Token(kind, self.source, start, end, self.line)
+
+    def lastLine(self, end):
+        # Offset just after the last thing before end, and its line. The EOF token goes there, rather than on the
+        # empty line after the file's last newline (or the one Lexer adds), so errors at the end point at a real line.
+        blank = end
+        while blank and self.source[blank - 1 : blank] in self.BLANK:
+            blank -= 1
+
+        return blank, self.line - self.source[blank : end].count(self.BLANK[-1:])
+
+    def tokenize(self):
+        # Lex the rest of the source into a compact TokenBuffer (a ByteTokenBuffer for a FileLexer's bytes)
+        buffer = TokenBuffer(self.source) if isinstance(self.source, str) else ByteTokenBuffer(self.source)
+        token = self.getToken()
+        while token.kind is not TokenType.EOF:
+            buffer.append(token)
+            token = self.getToken()
+
+        buffer.append(token)
+        return buffer
+
+    def unknownToken(self):
+        pos = SKIP_PATTERN.match(self.source, self.ptr).end()
+        char = self.source[pos]
+        self.ptr = pos + 1
+
+        match(char):
+            case '!':
+                self.abort(f"Expected '!=', got '!{self.source[pos + 1 : pos + 2]}'", pos)
 
-    def nextChar(self) -> None:
-        self.ptr += 1
-        if self.ptr >= len(self.source):
-            self.char = '\0'
-        else:
-            self.char = self.source[self.ptr]
+            case '\"':
+                self.abort("Unterminated string", pos)
+
+            case _:
+                self.abort(f"Unknown token: '{char}'", pos)
+
+    def abort(self, message, pos):
+        if self.diagnostics is None:
+            sys.exit(f"Lexing error. {message}")
 
-    def peek(self):  # Returns the next char without being there
-        if (self.ptr + 1) >= len(self.source):
-            return '\0'
+        self.diagnostics.add(Diagnostic(message, self.line, pos - self.source.rfind("\n", 0, pos), "Lexing error"))
 
-        return self.source[self.ptr + 1]
 
-    def skipWhitespace(self):
-        while self.char == ' ' or self.char == '\t' or self.char == '\r':
-            self.nextChar()
+KIND_CODES = {kind.value: kind for kind in TokenType}
 
-    def skipComment(self):
-        if self.char == '/':
-            if self.peek() == '/':
-                self.nextChar()
-                while self.char != '\n':
-                    self.nextChar()
+
+class TokenBuffer():
+    # Struct-of-arrays token stream: one kind code, (start, end) offset pair and line per token in flat arrays,
+    # a few bytes per token instead of an object each. Token objects are only built as getToken hands them out.
+    def __init__(self, source) -> None:
+        self.source = source
+        self.kinds = array.array('h')
+        self.starts = array.array('q')
+        self.ends = array.array('q')
+        self.lines = array.array('l')
+        self.ptr = 0  # Index of the next token to hand out
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def append(self, token):
+        self.kinds.append(token.kind.value)
+        self.starts.append(token.start)
+        self.ends.append(token.end)
+        self.lines.append(token.line)
 
     def getToken(self):
-        self.skipWhitespace()
-        self.skipComment()
-        token = None
-
-        match(self.char):
-            case '+':
-                token = Token(self.char, TokenType.PLUS)
-
-            case '-':
-                token = Token(self.char, TokenType.MINUS)
-
-            case '*':
-                token = Token(self.char, TokenType.ASTERISK)
-
-            case '/':
-                token = Token(self.char, TokenType.SLASH)
-
-            case '<':  # Check for >= or >
-                if (self.peek == '='):
-                    lastChar = self.char
-                    self.nextChar()
-                    token = Token(lastChar + self.char, TokenType.LTEQ)
-                else:
-                    token = Token(self.char, TokenType.LT)
-
-            case '>':  # Check for <= or <
-                if (self.peek == '='):
-                    lastChar = self.char
-                    self.nextChar()
-                    token = Token(lastChar + self.char, TokenType.GTEQ)
-                else:
-                    token = Token(self.char, TokenType.GT)
+        i = self.ptr
+        if i >= len(self.kinds) - 1:  # Keep handing out EOF once the end is reached
+            i = len(self.kinds) - 1
+        else:
+            self.ptr += 1
 
-            case '!':
-                if (self.peek() == '='):
-                    lastChar = self.char
-                    self.nextChar()
-                    token = Token(lastChar + self.char, TokenType.NOTEQ)
-                else:
-                    self.abort(f"Expected '!=', got '!{self.peek()}'")
-
-            case '=':
-                if (self.peek() == '='):
-                    lastChar = self.char
-                    self.nextChar()
-                    token = Token(lastChar + self.char, TokenType.EQEQ)
-                else:
-                    token = Token(self.char, TokenType.EQ)
+        kind = KIND_CODES[self.kinds[i]]
+        start = self.starts[i]
+        end = self.ends[i]
 
-            case '\"':
-                self.nextChar()
-                startPos = self.ptr
+        if kind is TokenType.IDENT or kind.value > 100 and kind.value <= 200:
+            return Token(kind, self.source, start, end, self.lines[i], sys.intern(self.source[start : end]))
+
+        elif kind is TokenType.EOF:
+            return Token(kind, self.source, start, end, self.lines[i], '\0')
 
-                while self.char != '\"':
-                    self.nextChar()
+        return Token(kind, self.source, start, end, self.lines[i])
 
-                tokText = self.source[startPos : self.ptr]
-                token = Token(tokText, TokenType.STRING)
 
-            case ch if re.match(r"[0-9]", ch): # Digit encountered
-                startPos = self.ptr
+class ByteToken(Token):
+    # Token whose source is bytes (a FileLexer's mapped file), decoded when its text is needed
+    __slots__ = ()
 
-                while re.match(r"[0-9]", self.peek()):
-                    self.nextChar()
-                if self.peek() == '.':
-                    self.nextChar()
+    def __getattr__(self, name):
+        if name != "text":
+            raise AttributeError(name)
 
-                    if not re.match(r"[0-9]", self.peek()):
-                        self.abort("Illegal character in number")
+        self.text = self.source[self.start : self.end].decode()
+        return self.text
 
-                    while re.match(r"[0-9]", self.peek()):
-                        self.nextChar()
+    @property
+    def col(self):  # In bytes
+        return self.start - self.source.rfind(b"\n", 0, self.start)
 
-                tokText = self.source[startPos : self.ptr + 1]
-                token = Token(tokText, TokenType.NUMBER)
 
-            case ':':
-                token = Token(self.char, TokenType.COLON)
+class ByteTokenBuffer(TokenBuffer):
+    # TokenBuffer over a bytes-like source, handing out ByteTokens
+    def getToken(self):
+        i = self.ptr
+        if i >= len(self.kinds) - 1:
+            i = len(self.kinds) - 1
+        else:
+            self.ptr += 1
+
+        kind = KIND_CODES[self.kinds[i]]
+        start = self.starts[i]
+        end = self.ends[i]
 
-            case '\n':
-                token = Token(self.char, TokenType.NEWLINE)
+        if kind is TokenType.IDENT or kind.value > 100 and kind.value <= 200:
+            return ByteToken(kind, self.source, start, end, self.lines[i], sys.intern(self.source[start : end].decode()))
 
-            case '\0':
-                token = Token(self.char, TokenType.EOF)
+        elif kind is TokenType.EOF:
+            return ByteToken(kind, self.source, start, end, self.lines[i], '\0')
 
-            case ch if re.match(r"[a-zA-Z0-9_]+$", ch): # Alphanumeric
-                startPos = self.ptr
+        return ByteToken(kind, self.source, start, end, self.lines[i])
 
-                while re.match(r"[a-zA-Z0-9_]+$", self.peek()):
-                    self.nextChar()
 
-                tokText = self.source[startPos : self.ptr + 1]
+class FileLexer(Lexer):
+    # Lexes a memory-mapped file (or any bytes-like source) in place. Nothing is read into a str, and unlike Lexer
+    # there's no copy with a newline added: a file that doesn't end in one gets a NEWLINE token before EOF instead.
+    # Pages already lexed are handed back to the OS every RELEASE_BYTES, so resident memory stays flat however
+    # large the file; tokens that look back at their text later just fault the page in again.
+    RELEASE_BYTES = 8 << 20
+    BLANK = b" \t\r\n"
 
-                keyword = self.checkKeyword(tokText)
-                if keyword == None:
-                    token = Token(tokText, TokenType.IDENT)
-                else:
-                    token = Token(tokText, keyword)
-                pass
+    def __init__(self, source, line=1, diagnostics=None) -> None:
+        self.source = source
+        self.ptr = 0
+        self.line = line
+        self.diagnostics = diagnostics
+        self.ended = not source or source[-1:] == b"\n"  # The last line has its NEWLINE
+        self.release = self.RELEASE_BYTES if isinstance(source, mmap.mmap) and hasattr(mmap, "MADV_DONTNEED") else None
 
-            case '[':
-                token = Token(self.char, TokenType.OPEN_SQ_BRAC)
+    def getToken(self):
+        match = BYTE_TOKEN_PATTERN.match(self.source, self.ptr)
+
+        while match is None:
+            self.unknownToken()
+            match = BYTE_TOKEN_PATTERN.match(self.source, self.ptr)
+
+        self.ptr = match.end()
+        name = match.lastgroup
+        kind = GROUP_KINDS.get(name)
+        start, end = match.span(name)
+
+        match(kind):
+            case TokenType.IDENT:
+                tokText = sys.intern(self.source[start : end].decode())
+                return ByteToken(KEYWORDS.get(tokText, kind), self.source, start, end, self.line, tokText)
+
+            case TokenType.NEWLINE:
+                self.line += 1
+                if self.release is not None and start >= self.release:
+                    self.releasePages(start)
+
+                return ByteToken(kind, self.source, start, end, self.line - 1)
+
+            case TokenType.STRING:
+                line = self.line
+                self.line += self.source[start : end].count(b"\n")
+                return ByteToken(kind, self.source, start, end, line)
+
+            case TokenType.EOF:
+                if not self.ended:
+                    self.ended = True
+                    self.line += 1
+                    return ByteToken(TokenType.NEWLINE, self.source, start, end, self.line - 1, "\n")
+
+                # A file without a final newline has the NEWLINE above counted but nothing in the source to count back over
+                missing = start > 0 and self.source[start - 1 : start] != b"\n"
+                end, line = self.lastLine(start)
+                return ByteToken(kind, self.source, end, end, line - missing, '\0')
+
+            case None:  # BAD_NUMBER
+                self.abort("Illegal character in number", start)
+                return self.getToken()
+
+        return ByteToken(kind, self.source, start, end, self.line)
+
+    def releasePages(self, pos):
+        # Drop the mapped pages before pos from memory; they're read back from the file if touched again
+        end = pos - pos % mmap.PAGESIZE
+        self.source.madvise(mmap.MADV_DONTNEED, 0, end)
+        self.release = pos + self.RELEASE_BYTES
+
+    def unknownToken(self):
+        pos = BYTE_SKIP_PATTERN.match(self.source, self.ptr).end()
+        char = self.source[pos : pos + 1].decode(errors="replace")
+        self.ptr = pos + 1
+
+        match(char):
+            case '!':
+                self.abort(f"Expected '!=', got '!{self.source[pos + 1 : pos + 2].decode(errors='replace')}'", pos)
 
-            case ']':
-                token = Token(self.char, TokenType.CLOSE_SQ_BRAC)
+            case '\"':
+                self.abort("Unterminated string", pos)
 
             case _:
-                self.abort(f"Unknown token: '{self.char}'")
+                self.abort(f"Unknown token: '{char}'", pos)
 
-        self.nextChar()
-        return token
+    def abort(self, message, pos):
+        if self.diagnostics is None:
+            sys.exit(f"Lexing error. {message}")
 
-    def abort(self, message):
-        sys.exit(f"Lexing error. {message}")
+        col = pos - self.source.rfind(b"\n", 0, pos)
+        self.diagnostics.add(Diagnostic(message, self.line, col, "Lexing error"))
@@ -0,0 +1,263 @@
+import collections
+import copy
+import deadcode
+from nodes import *
+
+# Loop-invariant code motion (-O2). Inside a loop, any part of an expression whose variables the loop never
+# assigns (the FOR iterator and every name assigned, INPUT, DECLAREd or iterated anywhere in the body) works out
+# the same on every pass. It's computed once before the loop into a temporary (a Constant named _cie_inv<n>,
+# a prefix the generated code already keeps for itself), and the loop reads that instead. A whole assignment is
+# moved out the same way when it's the only one to its variable and nothing in the loop reads the variable first.
+#
+# Only expressions that are evaluated on every pass are moved: the loop's own condition and the top level
+# statements of its body, not what's inside an IF or a nested loop's body. A nested loop is optimized on its own
+# first. What comes from the body is then only evaluated if the body runs at least once, so a WHILE or FOR is
+# guarded by an IF on its first test, and it's left alone if that test can't be written down. As long as the loop
+# runs at all, the same expressions are evaluated as before, once instead of on every pass.
+#
+# Nothing that can fail is moved (array reads, division by anything but a non-zero literal, variables that may not
+# have a value yet, see deadcode.safe): evaluated ahead of the statements before it in the loop, its error would
+# come before their OUTPUT or INPUT.
+
+PREFIX = "_cie_inv"
+
+
+def worthwhile(node):
+    # Whether a temporary saves anything over evaluating the expression itself
+    match node:
+        case UnaryOp(_, Name() | Number()):
+            return False
+
+        case BinOp() | UnaryOp() | Compare() | Index() | Convert():
+            return True
+
+    return False
+
+
+def assigned(body, counts):
+    # Count every statement in body that assigns each name
+    for node in body:
+        match node:
+            case For(name, _, _, _, inner):
+                counts[name] += 1
+                assigned(inner, counts)
+
+            case Assign(name) | IndexAssign(name) | Input(name) | Declare(name) | Constant(name):
+                counts[name] += 1
+
+            case While(_, inner) | Repeat(inner) | Block(inner):
+                assigned(inner, counts)
+
+            case If(branches, orelse):
+                for _, inner in branches:
+                    assigned(inner, counts)
+
+                if orelse is not None:
+                    assigned(orelse, counts)
+
+
+def reads(node, names):
+    # Add every name node reads, in any expression or nested statement
+    match node:
+        case list():
+            for statement in node:
+                reads(statement, names)
+
+        case Name(name):
+            names.add(name)
+
+        case Index(name, index):
+            names.add(name)
+            reads(index, names)
+
+        case UnaryOp(_, operand):
+            reads(operand, names)
+
+        case BinOp(_, left, right) | Compare(_, left, right):
+            reads(left, names)
+            reads(right, names)
+
+        case Convert(_, value) | Output(value) | Constant(_, value) | Assign(_, _, value):
+            reads(value, names)
+
+        case IndexAssign(_, index, _, value):
+            reads(index, names)
+            reads(value, names)
+
+        case If(branches, orelse):
+            for condition, body in branches:
+                reads(condition, names)
+                reads(body, names)
+
+            if orelse is not None:
+                reads(orelse, names)
+
+        case While(condition, body) | Repeat(body, condition):
+            reads(condition, names)
+            reads(body, names)
+
+        case For(_, start, end, step, body):
+            reads(start, names)
+            reads(end, names)
+            reads(step, names)  # Nothing to read without a STEP
+            reads(body, names)
+
+        case Block(body):
+            reads(body, names)
+
+
+class Hoister():
+    def __init__(self) -> None:
+        self.count = 0  # Temporaries made so far; names only have to differ between loops nested in each other
+        self.unset = set()  # Names read anywhere they may not have a value yet (see deadcode.unassigned)
+
+    def body(self, body):
+        return [self.statement(statement) for statement in body]
+
+    def statement(self, node):
+        # The statement, optimized; a loop with anything moved out of it comes back as a Block or IF around it
+        match node:
+            case If(branches, orelse):
+                node.branches = [(condition, self.body(body)) for condition, body in branches]
+                if orelse is not None:
+                    node.orelse = self.body(orelse)
+
+            case Block(body):
+                node.body = self.body(body)
+
+            case While(condition, body):
+                node.body = self.body(body)
+                counts = collections.Counter()
+                assigned(node.body, counts)
+
+                before = []
+                node.condition = self.hoist(condition, counts, before, node.line)
+
+                read = set()
+                reads(node.condition, read)  # The condition is tested before the body first runs
+                inside = []
+                node.body = self.moveOut(node.body, counts, read, inside, node.line)
+
+                if inside:
+                    node = If([(copy.deepcopy(node.condition), inside + [node])], None, node.line)
+
+                if before:
+                    node = Block(before + [node], node.line)
+
+            case Repeat(body, condition):
+                node.body = self.body(body)
+                counts = collections.Counter()
+                assigned(node.body, counts)
+
+                # The body always runs once, nothing needs guarding
+                before = []
+                node.body = self.moveOut(node.body, counts, set(), before, node.line)
+                node.condition = self.hoist(condition, counts, before, node.line)
+
+                if before:
+                    node = Block(before + [node], node.line)
+
+            case For(name, start, end, step, body, declares):
+                node.body = self.body(body)
+
+                # Runs at least once when start < end, if it's known to count up. A loop over an existing iterator
+                # isn't guarded, C++ still assigns the iterator when the loop doesn't run.
+                if declares and (step is None or isinstance(step, Number) and float(step.text) > 0):
+                    counts = collections.Counter({name: 1})
+                    assigned(node.body, counts)
+
+                    read = set()  # The bounds are worked out before the body runs
+                    reads(start, read)
+                    reads(end, read)
+                    inside = []
+                    node.body = self.moveOut(node.body, counts, read, inside, node.line)
+
+                    if inside:
+                        first = Compare("<", copy.deepcopy(start), copy.deepcopy(end))
+                        node = If([(first, inside + [node])], None, node.line)
+
+        return node
+
+    def moveOut(self, body, counts, read, moved, line):
+        # The top level statements of a loop body, with what doesn't change from pass to pass moved into moved.
+        # read: names read before the body runs
+        kept = []
+
+        for statement in body:
+            if isinstance(statement, Assign) and counts[statement.name] == 1 and statement.name not in read \
+                    and self.invariant(statement.value, counts) and deadcode.safe(statement.value, self.unset):
+                moved.append(statement)
+                del counts[statement.name]  # Now set before the loop, and never changed in it
+                continue
+
+            match statement:
+                case Output(value) | Assign(_, _, value) | Constant(_, value):
+                    statement.value = self.hoist(value, counts, moved, line)
+
+                case IndexAssign(_, index, _, value):
+                    statement.index = self.hoist(index, counts, moved, line)
+                    statement.value = self.hoist(value, counts, moved, line)
+
+                case If(branches):  # Only the first condition is always tested
+                    condition, inner = branches[0]
+                    branches[0] = (self.hoist(condition, counts, moved, line), inner)
+
+                case While(condition):
+                    statement.condition = self.hoist(condition, counts, moved, line)
+
+                case For(_, start, end, step):
+                    statement.start = self.hoist(start, counts, moved, line)
+                    statement.end = self.hoist(end, counts, moved, line)
+                    if step is not None:
+                        statement.step = self.hoist(step, counts, moved, line)
+
+            reads(statement, read)
+            kept.append(statement)
+
+        return kept
+
+    def invariant(self, node, counts):
+        match node:
+            case Number() | String() | Boolean():
+                return True
+
+            case Name(name):
+                return counts[name] == 0
+
+            case Index(name, index):
+                return counts[name] == 0 and self.invariant(index, counts)
+
+            case UnaryOp(_, operand) | Convert(_, operand):
+                return self.invariant(operand, counts)
+
+            case BinOp(_, left, right) | Compare(_, left, right):
+                return self.invariant(left, counts) and self.invariant(right, counts)
+
+        return False
+
+    def hoist(self, node, counts, moved, line):
+        # node, with its largest loop-invariant parts that can't fail replaced by temporaries computed in moved
+        if self.invariant(node, counts) and deadcode.safe(node, self.unset):
+            if not worthwhile(node):
+                return node
+
+            name = f"{PREFIX}{self.count}"
+            self.count += 1
+            moved.append(Constant(name, node, line))
+            return Name(name, "CONSTANT")
+
+        match node:
+            case Index(_, index):
+                node.index = self.hoist(index, counts, moved, line)
+
+            case UnaryOp(_, operand):
+                node.operand = self.hoist(operand, counts, moved, line)
+
+            case Convert(_, value):
+                node.value = self.hoist(value, counts, moved, line)
+
+            case BinOp(_, left, right) | Compare(_, left, right):
+                node.left = self.hoist(left, counts, moved, line)
+                node.right = self.hoist(right, counts, moved, line)
+
+        return node
@@ -1,40 +1,159 @@
+import argparse
+import functools
 import sys
-from lex import *
-from parser import *
-from emit import *
-import cpp_parse
+import cache
+import driver
+
+# -O levels for the C++ compiler behind cpp --run (native.build)
+CXX_OPT_LEVELS = ("0", "1", "2", "3", "s", "fast")
+
 
 def main():
-    print("CIE Pseudocode compiler by Opyu")
+    args = argparse.ArgumentParser(prog="main.py", fromfile_prefix_chars="@",
+                                   description="Compile CIE pseudocode to Python or C++. "
+                                               "Arguments can be read from a file with @file.")
+    args.add_argument("paths", nargs="*", metavar="file",
+                      help="source file and optionally its targets (e.g. 'prog.txt py,cpp'); "
+                           "with --batch, any number of files and directories")
+    args.add_argument("-t", "--target", default="py",
+                      help="comma separated targets, e.g. py,cpp (default: py)")
+    args.add_argument("--batch", action="store_true",
+                      help="compile every input in parallel, writing outputs next to the sources")
+    args.add_argument("-o", "--out-dir", help="write batch outputs into this directory instead")
+    args.add_argument("-j", "--jobs", type=int, help="batch worker processes (default: one per core)")
+    args.add_argument("--pattern", default="*.txt", help="files to pick up from batch directories (default: *.txt)")
+    args.add_argument("--watch", action="store_true",
+                      help="stay running and recompile the file incrementally whenever it changes")
+    args.add_argument("-O", "--optimize", type=int, choices=driver.LEVELS, default=0, metavar="LEVEL",
+                      help="0: none (default), 1: fold literal expressions, remove dead branches and loops, "
+                           "unused DECLAREs and assignments whose value is never read, "
+                           "2: also substitute CONSTANT values and move what doesn't change out of loops "
+                           "(--watch doesn't remove unused DECLAREs or assignments)")
+    args.add_argument("--fast-io", action="store_true",
+                      help="buffer the generated program's output instead of printing every OUTPUT straight away")
+    args.add_argument("--run", action="store_true",
+                      help="run the program after compiling it: Python in this process without writing out.py, "
+                           "C++ by building out.cpp with the local compiler ($CXX or g++)")
+    args.add_argument("--interpret", action="store_true",
+                      help="run the program straight from the syntax tree in this process, without generating code")
+    args.add_argument("--cxx-opt", default="2", choices=CXX_OPT_LEVELS, metavar="LEVEL",
+                      help="optimization level for the C++ compiler with --run (default: 2)")
+    args.add_argument("--timings", action="store_true",
+                      help="report the time and peak memory of every compile phase, token and symbol lookup counts "
+                           "and emitted bytes (bypasses the cache; always reads the file into memory, even one of 16 MiB "
+                           "or more that a compile would memory-map)")
+    args.add_argument("--timings-json", metavar="FILE",
+                      help="append the timings report to FILE as a line of JSON ('-' for stdout)")
+    args.add_argument("--profile", metavar="FILE", help="write cProfile stats for the compile to FILE")
+    args.add_argument("--max-errors", type=int, default=1, metavar="N",
+                      help="report up to N errors in one go instead of stopping at the first (default: 1)")
+    args.add_argument("--lex-jobs", type=int, default=1, metavar="N",
+                      help="lex a big source (1 MiB or more) with N processes (default: 1)")
+    args.add_argument("--verbose", action="store_true",
+                      help="list the dead code -O1 and up removed (bypasses the cache)")
+    args.add_argument("--no-cache", action="store_true", help="neither use nor update the compilation cache")
+    args.add_argument("--clear-cache", action="store_true", help="empty the compilation cache first")
+    options = args.parse_args()
+
+    # With --run the program's output is the only thing on stdout
+    log = functools.partial(print, file=sys.stderr) if options.run or options.interpret else print
+    log("CIE Pseudocode compiler by Opyu")
+
+    if options.clear_cache:
+        cache.clearAll()
+        log("Cache cleared.")
+        if not options.paths:
+            return
+
+    instrument = options.timings or options.timings_json is not None or options.profile is not None
+    if instrument and (options.watch or options.run or options.interpret):
+        args.error("--timings, --timings-json and --profile can't be combined with --watch, --run or --interpret")
+
+    if options.lex_jobs > 1 and (options.batch or options.watch or instrument):
+        args.error("--lex-jobs can't be combined with --batch, --watch, --timings, --timings-json or --profile")
+
+    if options.verbose and (options.batch or options.watch or instrument):
+        args.error("--verbose can't be combined with --batch, --watch, --timings, --timings-json or --profile")
+
+    # Nothing is optimized when the output comes from the cache, so there'd be nothing to list
+    noCache = options.no_cache or options.verbose
+    verbose = log if options.verbose else None
+
+    if options.batch:
+        if options.profile is not None:
+            args.error("--profile works on a single file, use --timings-json to collect timings from a batch")
 
-    if len(sys.argv) < 2:
+        import batch
+        if not batch.run(options.paths, options.target.split(","), options.out_dir, options.jobs, options.pattern,
+                         not options.no_cache, options.optimize, options.fast_io, options.timings,
+                         options.timings_json, options.max_errors):
+            sys.exit(1)
+        return
+
+    if not options.paths:
         sys.exit("Compiler needs a file as input.")
 
-    with open(sys.argv[1], 'r') as i:
-        source = i.read()
+    if len(options.paths) > 2:
+        args.error("expected a single source file and its targets (use --batch for several files)")
+
+    if options.interpret:
+        if options.watch or options.run:
+            args.error("--interpret can't be combined with --watch or --run")
+
+        import interp
+        with open(options.paths[0], 'r') as i:
+            program = driver.parse(i.read(), options.optimize, options.max_errors, options.lex_jobs, verbose)
+        sys.exit(interp.run(program, options.fast_io))
+
+    # Targets are a comma separated list of backends, e.g. "py,cpp". Defaults to Python.
+    targets = options.paths[1] if len(options.paths) > 1 else options.target
+    selected = driver.loadBackends(targets.split(","))
+
+    for backend in selected:
+        log(f"Compiling to {backend.NAME}.")
+
+    if options.run and (options.watch or len(selected) != 1):
+        args.error("--run needs a single target and can't be combined with --watch")
+
+    if options.run and selected[0].LANGUAGE == "python":
+        import pyrun
+        codeCache = None if noCache else cache.CompileCache("code")
+        code = pyrun.load(options.paths[0], options.optimize, options.fast_io, codeCache, options.max_errors,
+                          options.lex_jobs, verbose)
+        log("Compiling complete")
+        sys.exit(pyrun.run(code))
+
+    if options.watch:
+        import watch
+        watch.Watcher(options.paths[0], selected, options.optimize, options.fast_io).run()
+        return
+
+    if instrument:
+        import timings
+        report = timings.measure(options.paths[0], [(backend, backend.OUTPUT) for backend in selected],
+                                 options.optimize, options.fast_io, options.profile)
+        if options.timings:
+            for line in timings.describe(report):
+                log(line)
+        if options.timings_json is not None:
+            timings.save([report], options.timings_json)
 
+        log("Compiling complete")
+        return
 
-    lexer = Lexer(source)
+    compileCache = None if noCache else cache.CompileCache()
+    driver.compileFile(options.paths[0], [(backend, backend.OUTPUT) for backend in selected], compileCache,
+                       options.optimize, options.fast_io, options.max_errors, options.lex_jobs, verbose)
 
-    if (len(sys.argv) > 2):
-        if sys.argv[2].lower() == "cpp" or sys.argv[2].lower() == "c++":
-            emitter = Emitter("out.cpp")
-            print("Compiling to C++.")
-            parser = cpp_parse.Parser(lexer, emitter)
-        else:
-            sys.exit("Invalid language specified.")
-    else:
-        emitter = Emitter("out.py")
-        print("Compiling to Python.")
-        parser = Parser(lexer, emitter)
+    if compileCache is not None:
+        compileCache.trim()
+    log("Compiling complete")
 
-    emitter.writeFile()
+    if options.run:
+        import native
+        binaries = None if options.no_cache else cache.CompileCache("bin", maxBytes=256 << 20)
+        sys.exit(native.run(native.build(selected[0].OUTPUT, options.cxx_opt, binaries)))
 
-    parser.program()
-    print("Compiling complete")
-    # token = lexer.getToken()
-    # while token.kind != TokenType.EOF:
-    #     print(token.kind, token.text)
-    #     token = lexer.getToken()
 
-main()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
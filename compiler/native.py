@@ -0,0 +1,69 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+# Compile-and-run for the C++ backend: builds the generated C++ with the local compiler and runs it.
+# Binaries are cached (kind "bin") by the generated code, the compiler and the flags, so running an
+# unchanged program again skips the C++ compiler entirely.
+
+COMPILERS = ("g++", "clang++", "c++")
+
+
+def findCompiler():
+    # $CXX if set, otherwise the first of COMPILERS on the PATH
+    names = [os.environ["CXX"]] if os.environ.get("CXX") else COMPILERS
+
+    for name in names:
+        path = shutil.which(name)
+        if path is not None:
+            return path
+
+    sys.exit(f"Error: No C++ compiler found ({'set CXX' if os.environ.get('CXX') else 'install g++ or set CXX'}).")
+
+
+def compilerIdentity(path):
+    # Changes whenever the compiler is upgraded or CXX points somewhere else, without running it
+    real = os.path.realpath(path)
+    info = os.stat(real)
+    return f"{real}:{info.st_size}:{info.st_mtime_ns}"
+
+
+def binaryPath(source):
+    return os.path.splitext(source)[0] + (".exe" if os.name == "nt" else "")
+
+
+def build(source, optLevel="2", compileCache=None):
+    # Path of an executable built from the C++ file source
+    compiler = findCompiler()
+    flags = [f"-O{optLevel}", "-std=c++17"]
+
+    if compileCache is None:
+        binary = binaryPath(source)
+        if subprocess.run([compiler, *flags, source, "-o", binary]).returncode:
+            sys.exit("Error: C++ compilation failed.")
+        return binary
+
+    with open(source, 'rb') as f:
+        key = compileCache.key(f.read(), compilerIdentity(compiler), *flags)
+
+    binary = compileCache.get(key)
+    if binary is not None:
+        return binary
+
+    with tempfile.TemporaryDirectory() as work:
+        output = os.path.join(work, "program")
+        if subprocess.run([compiler, *flags, source, "-o", output]).returncode:
+            sys.exit("Error: C++ compilation failed.")
+
+        binary = compileCache.put(key, output, 0o755)
+
+    compileCache.trim()
+    return binary
+
+
+def run(binary):
+    # Run with this process's stdin, stdout and stderr; returns the exit status
+    sys.stdout.flush()
+    return subprocess.run([os.path.abspath(binary)]).returncode
@@ -0,0 +1,168 @@
+from dataclasses import dataclass
+
+# Typed syntax tree built by the Parser and consumed by the code generation backends.
+# Statements carry the source line they started on.
+
+node = dataclass(eq=False, slots=True)
+
+
+@dataclass(frozen=True, slots=True)
+class ArrayType:
+    # Symbol type of a DECLAREd array
+    element: str
+    lower: int
+    upper: int
+
+    def __str__(self):
+        return f"ARRAY[{self.lower}:{self.upper}] OF {self.element}"
+
+    @property
+    def length(self):
+        return self.upper - self.lower + 1
+
+
+# Expressions
+
+@node
+class Number:
+    text: str
+
+
+@node
+class String:
+    text: str
+
+
+@node
+class Boolean:
+    value: bool
+
+
+@node
+class Name:
+    name: str
+    type: str  # Declared type of the identifier
+
+
+@node
+class Index:
+    name: str
+    index: object
+    type: ArrayType
+
+
+@node
+class UnaryOp:
+    op: str
+    operand: object
+
+
+@node
+class BinOp:
+    op: str
+    left: object
+    right: object
+
+
+@node
+class Compare:
+    op: str
+    left: object
+    right: object
+
+
+@node
+class Convert:
+    type: str  # Type the value is converted to; a REAL becomes an INTEGER by truncating towards zero
+    value: object
+
+
+# Statements
+
+@node
+class Output:
+    value: object
+    line: int = 0
+
+
+@node
+class Input:
+    name: str
+    type: str
+    declares: bool  # INPUT into an undeclared identifier declares it as a STRING
+    line: int = 0
+
+
+@node
+class If:
+    branches: list  # (condition, body) for the IF and every ELSE IF
+    orelse: list  # ELSE body, or None
+    line: int = 0
+
+
+@node
+class While:
+    condition: object
+    body: list
+    line: int = 0
+
+
+@node
+class Repeat:
+    body: list
+    condition: object  # UNTIL condition
+    line: int = 0
+
+
+@node
+class For:
+    name: str
+    start: object
+    end: object
+    step: object  # None when there's no STEP
+    body: list
+    declares: bool  # The iterator wasn't declared beforehand
+    line: int = 0
+
+
+@node
+class Declare:
+    name: str
+    type: str  # Element type for arrays
+    bounds: ArrayType = None  # Arrays only
+    line: int = 0
+
+
+@node
+class Constant:
+    name: str
+    value: object
+    line: int = 0
+
+
+@node
+class Assign:
+    name: str
+    type: str  # Declared type of the variable
+    value: object
+    line: int = 0
+
+
+@node
+class IndexAssign:
+    name: str
+    index: object
+    type: ArrayType
+    value: object
+    line: int = 0
+
+
+@node
+class Block:
+    body: list  # Statements in a scope of their own, e.g. the IF branch left after optimizing away its condition
+    line: int = 0
+
+
+@node
+class Program:
+    body: list
@@ -0,0 +1,203 @@
+import math
+import operator
+from nodes import *
+from symbols import *
+from licm import *
+from deadcode import *
+from arith import divide
+
+# Optimization passes over the syntax tree, run between parsing and code generation.
+#
+# Level 1 folds arithmetic and comparisons on literals and removes IF branches and loops that can never run.
+# Level 2 also substitutes the value of every CONSTANT that folds down to a literal, and moves what doesn't change
+# from pass to pass out of loops (licm.py).
+#
+# Only what both backends agree on is folded: anything with a result outside the range of a C++ int, or involving
+# strings, is left alone.
+
+INT_MIN = -(1 << 31)
+INT_MAX = (1 << 31) - 1
+
+ARITHMETIC = {"+": operator.add, "-": operator.sub, "*": operator.mul, "/": operator.truediv, "//": divide}
+COMPARISONS = {"==": operator.eq, "!=": operator.ne, "<": operator.lt, "<=": operator.le,
+               ">": operator.gt, ">=": operator.ge}
+
+
+def evaluate(number):
+    text = number.text
+    return int(text) if text.lstrip("-").isdigit() else float(text)
+
+
+def literal(result):
+    # Number node for a folded result, or None if it can't be written the same way in every backend
+    if isinstance(result, int):
+        return Number(str(result)) if INT_MIN <= result <= INT_MAX else None
+
+    return Number(repr(result)) if math.isfinite(result) else None
+
+
+class Optimizer():
+    def __init__(self, level=1, constants=None, log=None) -> None:
+        self.level = level
+        self.constants = SymbolTable() if constants is None else constants  # CONSTANT name -> literal node
+        self.hoister = Hoister()
+        self.log = log  # Told what dead code elimination removes, if given
+
+    def program(self, program):
+        if self.level > 0:
+            program.body = self.topLevel(program.body)
+            program = DeadCode(self.log).program(program)  # Needs the whole program, so not in topLevel
+
+        return program
+
+    def topLevel(self, body):
+        # Optimize top-level statements; loops are only looked at for moving code out once they're fully folded
+        body = self.body(body)
+        if self.level >= 2:
+            # Names read where they may not have a value yet. Watch mode optimizes each chunk on its own, so there a
+            # name assigned in an earlier chunk counts too, and nothing reading it is moved.
+            self.hoister.unset = set()
+            unassigned(body, set(), self.hoister.unset)
+            body = self.hoister.body(body)
+
+        return body
+
+    def block(self, body):
+        self.constants.pushScope()
+        body = self.body(body)
+        self.constants.popScope()
+        return body
+
+    def body(self, body):
+        result = []
+
+        for statement in body:
+            statement = self.statement(statement)
+            if statement is not None:
+                result.append(statement)
+
+        return result
+
+    def inline(self, body, line):
+        # What's left of a statement whose body always runs exactly once
+        return Block(body, line) if body else None
+
+    def statement(self, node):
+        # The optimized statement, or None if it has no effect
+        match node:
+            case Output(value) | Constant(_, value) | Assign(_, _, value):
+                node.value = self.expression(value)
+
+                if self.level >= 2 and isinstance(node, Constant) and isinstance(node.value, (Number, String, Boolean)):
+                    self.constants.declare(node.name, node.value)
+
+            case IndexAssign(_, index, _, value):
+                node.index = self.expression(index)
+                node.value = self.expression(value)
+
+            case If(branches, orelse):
+                kept = []
+
+                for condition, body in branches:
+                    condition = self.expression(condition)
+
+                    match condition:
+                        case Boolean(False):
+                            continue
+
+                        case Boolean(True):  # Later branches and the ELSE are unreachable
+                            orelse = self.block(body)
+                            break
+
+                    kept.append((condition, self.block(body)))
+
+                else:
+                    if orelse is not None:
+                        orelse = self.block(orelse)
+
+                if not kept:
+                    return self.inline(orelse, node.line)
+
+                node.branches = kept
+                node.orelse = orelse
+
+            case While(condition, body):
+                node.condition = self.expression(condition)
+
+                if isinstance(node.condition, Boolean) and not node.condition.value:
+                    return None
+
+                node.body = self.block(body)
+
+            case Repeat(body, condition):
+                # Like the parser, the body's scope stays open for the UNTIL condition
+                self.constants.pushScope()
+                node.body = self.body(body)
+                node.condition = self.expression(condition)
+                self.constants.popScope()
+
+                if isinstance(node.condition, Boolean) and node.condition.value:
+                    return self.inline(node.body, node.line)
+
+            case For(_, start, end, step, body, declares):
+                node.start = self.expression(start)
+                node.end = self.expression(end)
+                if step is not None:
+                    node.step = self.expression(step)
+
+                node.body = self.block(body)
+
+                # A loop that never runs; one over an existing iterator still assigns it in C++
+                if declares and isinstance(node.start, Number) and isinstance(node.end, Number) \
+                        and (node.step is None or isinstance(node.step, Number) and evaluate(node.step) > 0) \
+                        and evaluate(node.start) >= evaluate(node.end):
+                    return None
+
+        return node
+
+    def expression(self, node):
+        match node:
+            case Name(name) if self.level >= 2:
+                return self.constants.lookup(name) or node
+
+            case Index(_, index):
+                node.index = self.expression(index)
+
+            case UnaryOp(op, operand):
+                node.operand = operand = self.expression(operand)
+
+                if isinstance(operand, Number):
+                    if op == "+":
+                        return operand
+
+                    return literal(-evaluate(operand)) or node
+
+            case BinOp(op, left, right):
+                node.left = left = self.expression(left)
+                node.right = right = self.expression(right)
+
+                if isinstance(left, Number) and isinstance(right, Number):
+                    a, b = evaluate(left), evaluate(right)
+
+                    if op in ("/", "//") and b == 0:
+                        return node
+
+                    return literal(ARITHMETIC[op](a, b)) or node
+
+            case Convert(varType, value):
+                node.value = value = self.expression(value)
+
+                if isinstance(value, Number):
+                    return literal(int(evaluate(value)) if varType == "INTEGER" else float(evaluate(value))) or node
+
+            case Compare(op, left, right):
+                node.left = left = self.expression(left)
+                node.right = right = self.expression(right)
+
+                if isinstance(left, Number) and isinstance(right, Number):
+                    return Boolean(COMPARISONS[op](evaluate(left), evaluate(right)))
+
+                if isinstance(left, Boolean) and isinstance(right, Boolean) and op in ("==", "!="):
+                    return Boolean(COMPARISONS[op](left.value, right.value))
+
+        return node
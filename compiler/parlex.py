@@ -0,0 +1,94 @@
+import bisect
+import multiprocessing
+import re
+from lex import *
+
+# Parallel lexing for large sources. Tokens never span lines except string literals, so the source is cut just after
+# newlines that aren't inside a string, and each chunk is lexed in a worker process. Workers get the whole source
+# once, when the pool starts (inherited rather than copied where processes fork), and lex their own range of it in
+# place, so token offsets and line numbers come out the same as lexing the whole file. Their token arrays are
+# stitched together into one TokenBuffer for the Parser.
+
+CHUNKS_PER_JOB = 4  # More chunks than workers, so one slow chunk doesn't hold up the rest
+MIN_CHUNK = 1 << 18  # Chars; smaller chunks cost more to hand around than they save
+
+# Strings and comments, in the order the lexer would meet them: a quote inside a comment doesn't start a string,
+# and // inside a string doesn't start a comment. An unterminated string runs to the end.
+STRING_OR_COMMENT = re.compile(r'//[^\n]*|"[^"]*"?')
+
+SOURCE = None  # The source being lexed, in each worker
+
+
+def boundaries(source, parts):
+    # Offsets that cut source into about parts chunks, each ending just after a newline outside any string
+    spans = [match.span() for match in STRING_OR_COMMENT.finditer(source)
+             if match.group().startswith('"') and "\n" in match.group()]
+    starts = [start for start, _ in spans]
+
+    cuts = []
+    size = max(MIN_CHUNK, len(source) // parts)
+    for target in range(size, len(source), size):
+        cut = source.find("\n", max(target, cuts[-1] if cuts else 0)) + 1
+
+        i = bisect.bisect_right(starts, cut - 1) - 1
+        while cut and i >= 0 and spans[i][0] < cut - 1 < spans[i][1]:  # The newline is inside a string
+            cut = source.find("\n", spans[i][1]) + 1
+            i = bisect.bisect_right(starts, cut - 1) - 1
+
+        if 0 < cut < len(source):
+            cuts.append(cut)
+
+    return sorted(set(cuts))
+
+
+def share(source):
+    global SOURCE
+    SOURCE = source
+
+
+def lexChunk(chunk):
+    # Token arrays (as bytes) for SOURCE[start:end], or None if there's a lexing error in it
+    start, end, line = chunk
+
+    lexer = Lexer("", line)
+    lexer.source = SOURCE  # Already has the newline Lexer adds, see tokenize()
+    lexer.ptr = start
+    buffer = TokenBuffer(SOURCE)
+
+    try:
+        while lexer.ptr < end:
+            buffer.append(lexer.getToken())
+
+        if end == len(SOURCE):
+            buffer.append(lexer.getToken())  # EOF
+
+    except SystemExit:  # The caller lexes serially instead, to report errors just like that would
+        return None
+
+    return buffer.kinds.tobytes(), buffer.starts.tobytes(), buffer.ends.tobytes(), buffer.lines.tobytes()
+
+
+def tokenize(source, jobs):
+    # The same TokenBuffer as Lexer(source).tokenize(), lexed by jobs processes; None if the source has a lexing error
+    source = source + "\n"
+    cuts = [0] + boundaries(source, jobs * CHUNKS_PER_JOB) + [len(source)]
+
+    chunks = []
+    line = 1
+    for start, end in zip(cuts, cuts[1:]):
+        chunks.append((start, end, line))
+        line += source.count("\n", start, end)
+
+    buffer = TokenBuffer(source)
+    with multiprocessing.Pool(min(jobs, len(chunks)), initializer=share, initargs=(source,)) as pool:
+        for result in pool.imap(lexChunk, chunks):
+            if result is None:
+                return None
+
+            kinds, starts, ends, lines = result
+            buffer.kinds.frombytes(kinds)
+            buffer.starts.frombytes(starts)
+            buffer.ends.frombytes(ends)
+            buffer.lines.frombytes(lines)
+
+    return buffer
@@ -1,43 +1,34 @@
 import sys
 from lex import *
+from symbols import *
+from nodes import *
+from diagnostics import *
 
-
-def checkItem(set, item) -> bool:
-    for i in set:
-        if item == i[0]:
-            return True
-
-    return False
-
-
-def findItem(set, item) -> tuple:
-    for i in set:
-        if item == i[0]:
-            return i
-
-    return None
+# Ends of the body of each compound statement, for skipping it when its first line has an error
+BODY_ENDS = {
+    TokenType.IF: (TokenType.ENDIF, TokenType.ELSE),
+    TokenType.WHILE: (TokenType.ENDWHILE,),
+    TokenType.FOR: (TokenType.NEXT,),
+    TokenType.REPEAT: (TokenType.UNTIL,),
+}
 
 
 class Parser():
-    def __init__(self, lexer, emitter) -> None:
+    def __init__(self, lexer, symbols=None, diagnostics=None) -> None:
         self.lexer = lexer
-        self.emitter = emitter
 
         self.curToken = None
         self.peekToken = None
-        self.symbols = set()
-        self.constants = set()
+        self.symbols = SymbolTable() if symbols is None else symbols  # Can carry on from an earlier parse
+        self.diagnostics = diagnostics  # Collects errors and carries on after them, instead of exiting on the first
 
         self.types = ["INTEGER", "BOOLEAN", "REAL", "STRING", "CHAR"]
 
-        self.nextToken()
-        self.nextToken()
-
     def checkToken(self, kind):
-        return kind == self.curToken.kind
+        return kind is self.curToken.kind
 
     def checkPeek(self, kind):
-        return kind == self.peekToken.kind
+        return kind is self.peekToken.kind
 
     def match(self, kind):
         if not self.checkToken(kind):
@@ -49,9 +40,11 @@ class Parser():
         self.curToken = self.peekToken
         self.peekToken = self.lexer.getToken()
 
-    @staticmethod
-    def abort(message):
-        sys.exit(f"Error: {message}")
+    def abort(self, message):
+        if self.diagnostics is None:
+            sys.exit(f"Error: {message}")
+
+        raise Diagnostic(message, self.curToken.line, self.curToken.col)
 
     def nl(self):
         self.match(TokenType.NEWLINE)
@@ -59,169 +52,186 @@ class Parser():
         while self.checkToken(TokenType.NEWLINE):
             self.nextToken()
 
+    def block(self, *ends):  # Statements up to (not including) one of the end tokens, in their own scope
+        self.symbols.pushScope()
+        body = self.statements(ends)
+        self.symbols.popScope()
+        return body
+
+    def statements(self, ends, body=None):  # Statements up to (not including) one of the end tokens, added to body
+        body = [] if body is None else body
+        depth = len(self.symbols.scopes)
+
+        while self.curToken.kind not in ends:
+            start = self.curToken
+            try:
+                body.append(self.statement())
+            except Diagnostic as error:  # Only raised when recovering, the try costs nothing otherwise
+                self.recover(error, start, depth, ends)
+
+        return body
+
+    def recover(self, error, start, depth, ends):
+        # Record the error and carry on from the next line. A compound statement with an error in its first line
+        # still has its body parsed, so errors in there are found too, but the body is then thrown away along with
+        # the statement, and its closing keyword is skipped rather than becoming another error.
+        if start.kind is TokenType.EOF:
+            error = Diagnostic(f"Expected {' or '.join(end.name for end in ends)} before the end of the file.",
+                               error.line, error.col)
+
+        self.diagnostics.add(error)
+        if self.checkToken(TokenType.EOF):
+            raise StopParsing()
+
+        while len(self.symbols.scopes) > depth:  # Scopes the statement opened
+            self.symbols.popScope()
+
+        self.skipLine()
+
+        if start.kind in BODY_ENDS and error.line == start.line:
+            while True:
+                self.block(*BODY_ENDS[start.kind])
+                end = self.curToken.kind
+                self.skipLine()
+
+                if end is not TokenType.ELSE:
+                    break
+
+    def skipLine(self):
+        # Skip past the next NEWLINE(s)
+        while not self.checkToken(TokenType.NEWLINE) and not self.checkToken(TokenType.EOF):
+            self.nextToken()
+
+        while self.checkToken(TokenType.NEWLINE):
+            self.nextToken()
+
     def statement(self):
+        line = self.curToken.line
+
         match(self.curToken.kind):
             case TokenType.OUTPUT:  # Check for OUTPUT statements
                 self.nextToken()
 
                 if self.checkToken(TokenType.STRING):
-                    self.emitter.emitLine(f'print("{self.curToken.text}")')
+                    node = Output(String(self.curToken.text), line)
                     self.nextToken()
                 else:
-                    self.emitter.emit(f'print(')
-                    self.expression()
-                    self.emitter.emitLine(')', 0)
+                    node = Output(self.expression(), line)
 
             case TokenType.INPUT:
                 self.nextToken()
+                name = self.curToken.text
+                varType = self.symbols.lookup(name)
 
-                if (self.curToken.text, "INTEGER") in self.symbols:
-                    self.emitter.emitLine(f"{self.curToken.text} = int(input(''))")
-                elif (self.curToken.text, "REAL") in self.symbols:
-                    self.emitter.emitLine(f"{self.curToken.text} = float(input(''))")
+                if varType is None:
+                    self.symbols.declare(name, "STRING")
+                    node = Input(name, "STRING", True, line)
 
-                elif (checkItem(self.symbols, self.curToken.text)):
-                    self.abort(f"Undefined type conversion from 'STRING' to '{findItem(self.symbols, self.curToken.text)[1]}'.")
+                elif varType in ("INTEGER", "REAL", "STRING", "CHAR"):
+                    node = Input(name, varType, False, line)
 
                 else:
-                    self.symbols.add((self.curToken.text, "STRING"))
-                    self.emitter.emitLine(f"{self.curToken.text} = input('')")  # Assume float.
+                    self.abort(f"Undefined type conversion from 'STRING' to '{varType}'.")
 
                 self.match(TokenType.IDENT)
 
-            case TokenType.IF:  # IF <comparison> THEN ... ENDIF
-                prevSymbols = set(self.symbols)
-                self.emitter.emit("if (")
+            case TokenType.IF:  # IF <comparison> THEN ... {ELSE IF <comparison> THEN ...} {ELSE ...} ENDIF
                 self.nextToken()
-                self.comparison()
-
+                condition = self.comparison()
                 self.match(TokenType.THEN)
                 self.nl()
-                self.emitter.emitLine("):", 0)
-                self.emitter.scope += 1
 
-                while not self.checkToken(TokenType.ENDIF) and not self.checkToken(TokenType.ELSE):  # Check for ... statements inside IF block
-                    self.statement()
+                branches = [(condition, self.block(TokenType.ENDIF, TokenType.ELSE))]
+                orelse = None
 
-                def check_else():
-                    if self.checkToken(TokenType.ELSE):  # ELSE ...
-                        # ELIFS are actually not defined by CIE Pseudocode
-                        self.emitter.scope -= 1
+                while self.checkToken(TokenType.ELSE):
+                    # ELIFS are actually not defined by CIE Pseudocode
+                    self.nextToken()
 
+                    if self.checkToken(TokenType.IF):  # ELSE IF <condition> THEN
                         self.nextToken()
-
-                        if self.checkToken(TokenType.IF):  # ELSE IF <condition> THEN
-                            self.nextToken()
-                            self.emitter.emit("elif (")
-                            self.comparison()
-                            self.emitter.emitLine("):", 0)
+                        try:
+                            condition = self.comparison()
                             self.match(TokenType.THEN)
                             self.nl()
+                        except Diagnostic as error:  # The branch is still parsed, so the rest of the IF lines up
+                            self.diagnostics.add(error)
+                            self.skipLine()
+                            condition = Boolean(False)
 
-                            self.emitter.scope += 1
-                            while not self.checkToken(TokenType.ENDIF) and not self.checkToken(TokenType.ELSE):
-                                self.statement()
+                        branches.append((condition, self.block(TokenType.ENDIF, TokenType.ELSE)))
 
-                            check_else()
-
-                        else:
-                            self.match(TokenType.NEWLINE)
-                            self.emitter.emitLine("else:")
-
-                            self.emitter.scope += 1
-                            while not self.checkToken(TokenType.ENDIF):
-                                self.statement()
+                    else:
+                        self.nl()
+                        orelse = self.block(TokenType.ENDIF)
+                        break
 
-                check_else()
-                self.match(TokenType.ENDIF) # Emit error for missing ENDIF
-                self.emitter.scope -= 1
-                self.emitter.emit("\n")
-                self.symbols = set(prevSymbols)
+                self.match(TokenType.ENDIF)  # Emit error for missing ENDIF
+                node = If(branches, orelse, line)
 
             case TokenType.WHILE:
-                prevSymbols = set(self.symbols)
-                self.emitter.emit("while (")
                 self.nextToken()
-                self.comparison()
-
-                self.match(TokenType.NEWLINE)
-                self.emitter.emitLine("):", 0)
-                self.emitter.scope += 1
-
-                while not self.checkToken(TokenType.ENDWHILE):
-                    self.statement()
+                condition = self.comparison()
+                self.nl()
 
+                body = self.block(TokenType.ENDWHILE)
                 self.match(TokenType.ENDWHILE)
-                self.emitter.scope -= 1
-                self.emitter.emit("\n")
-                self.symbols = set(prevSymbols)
+                node = While(condition, body, line)
 
             case TokenType.FOR:  # FOR <ident> = <expr> TO <expr> {STEP <expr>}
-                prevSymbols = set(self.symbols)
-                self.emitter.emit("for")
                 self.nextToken()
+                self.symbols.pushScope()
 
-                if not checkItem(self.symbols, self.curToken.text):  # <ident>
-                    self.symbols.add((self.curToken.text, "INTEGER"))
+                name = self.curToken.text
+                declares = name not in self.symbols
 
-                elif (self.curToken.text, "INTEGER") not in self.symbols:
-                    self.abort(f"Unable to iterate using type '{findItem(self.symbols, self.curToken.text)[1]}'.")
+                if declares:  # <ident>
+                    self.symbols.declare(name, "INTEGER")
 
-                self.emitter.emit(f" {self.curToken.text} in range(", 0)
+                elif self.symbols.lookup(name) != "INTEGER":
+                    self.abort(f"Unable to iterate using type '{self.symbols.lookup(name)}'.")
 
-                self.nextToken()
+                self.match(TokenType.IDENT)
                 self.match(TokenType.EQ)  # =
 
-                self.expression()  # <expr>
+                start = self.expression()  # <expr>
 
                 self.match(TokenType.TO)  # TO
-                self.emitter.emit(", ", 0)
 
-                self.expression()  # <expr>
+                end = self.expression()  # <expr>
+                step = None
 
                 if self.checkToken(TokenType.STEP):  # STEP <expr>
                     self.nextToken()
-                    self.emitter.emit(", ", 0)
-                    self.expression()
+                    step = self.expression()
 
                 self.nl()
-                self.emitter.emitLine("):", 0)
-                self.emitter.scope += 1
-
-                while not self.checkToken(TokenType.NEXT):
-                    self.statement()
 
+                body = self.block(TokenType.NEXT)
                 self.match(TokenType.NEXT)
-                self.nextToken()
-
-                self.emitter.emitLine("")
-                self.emitter.scope -= 1
+                self.match(TokenType.IDENT)
 
-                self.symbols = set(prevSymbols)
+                self.symbols.popScope()
+                node = For(name, start, end, step, body, declares, line)
 
             case TokenType.DECLARE:
                 # DECLARE arr : [1:10] OF INTEGER
                 self.nextToken()
 
                 identName = self.curToken.text
-                self.emitter.emit(f"{self.curToken.text} = ")
                 self.match(TokenType.IDENT)
                 self.match(TokenType.COLON)
 
+                if identName in self.symbols:
+                    self.abort(f"Re-declaration of identifier '{identName}'.")
+
                 if not self.curToken.text in self.types:
                     # Check if []
-                    if self.curToken.text == '[':
+                    if self.checkToken(TokenType.OPEN_SQ_BRAC):
                         self.nextToken()
-                        print(self.curToken.text)
-                        self.match(TokenType.NUMBER)
-                        print(self.curToken.text)
+                        lower = self.bound()
                         self.match(TokenType.COLON)
-                        print(self.curToken.text)
-                        self.match(TokenType.NUMBER)
-                        print(self.curToken.text)
-
-                        self.emitter.emit(f"[]", 0)
-
+                        upper = self.bound()
                         self.match(TokenType.CLOSE_SQ_BRAC)
 
                         self.match(TokenType.OF)
@@ -229,152 +239,194 @@ class Parser():
                         if not self.curToken.text in self.types:
                             self.abort(f"Unknown type: '{self.curToken.text}'.")
 
-                        self.emitter.emitLine(f"  # Type {self.curToken.text}", 0)
+                        if upper < lower:
+                            self.abort(f"Invalid bounds for array '{identName}': [{lower}:{upper}].")
 
                         # Array of type self.curToken.text
+                        arrayType = ArrayType(self.curToken.text, lower, upper)
+                        self.symbols.declare(identName, arrayType)
+                        node = Declare(identName, self.curToken.text, arrayType, line)
                         self.nextToken()
                     else:
                         self.abort(f"Unknown type: '{self.curToken.text}'.")
 
                 else:
-                    self.emitter.emit(f"None", 0)
-                    self.emitter.emitLine(f"  # Type {self.curToken.text}", 0)
-
-                    if not checkItem(self.symbols, identName):
-                        self.symbols.add((identName, self.curToken.text))
-                    else:
-                        self.abort(f"Re-declaration of identifier '{identName}'.")
-
+                    self.symbols.declare(identName, self.curToken.text)
+                    node = Declare(identName, self.curToken.text, None, line)
                     self.nextToken()
 
             case TokenType.CONSTANT:
                 self.nextToken()
+                name = self.curToken.text
 
-                if not checkItem(self.symbols, self.curToken.text):
-                    self.symbols.add((self.curToken.text, "CONSTANT"))
-                    self.emitter.emit(f"{self.curToken.text} = ")
+                if name not in self.symbols:
+                    self.symbols.declare(name, "CONSTANT")
                 else:
-                    self.abort(f"Re-declaration of CONSTANT '{self.curToken.text}'.")
-
+                    self.abort(f"Re-declaration of CONSTANT '{name}'.")
 
                 self.match(TokenType.IDENT)
-
                 self.match(TokenType.EQ)
 
-                self.expression()
-                self.emitter.emitLine("")
+                node = Constant(name, self.expression(), line)
 
+            case TokenType.IDENT:
+                name = self.curToken.text
 
+                if name not in self.symbols:
+                    self.abort(f"Unknown identifier: {name}.")
 
-            case TokenType.IDENT:
-                if not findItem(self.symbols, self.curToken.text):
-                    self.abort(f"Unknown identifier: {self.curToken.text}.")
+                varType = self.symbols.lookup(name)
 
-                if (self.curToken.text, "CONSTANT") in self.symbols:
-                    self.abort(f"Re-assignment of CONSTANT '{self.curToken.text}'.")
+                if varType == "CONSTANT":
+                    self.abort(f"Re-assignment of CONSTANT '{name}'.")
 
-                self.emitter.emit(f"{self.curToken.text}")
                 self.nextToken()
-                self.match(TokenType.EQ)
-                self.emitter.emit(" = ", 0)
-                self.expression()
-                self.emitter.emitLine("")
+
+                if self.checkToken(TokenType.OPEN_SQ_BRAC):  # <ident>[<expr>] = <expr>
+                    index = self.subscript(name, varType)
+                    self.match(TokenType.EQ)
+                    node = IndexAssign(name, index, varType, self.expression(), line)
+
+                else:
+                    if isinstance(varType, ArrayType):
+                        self.abort(f"Assignment to array '{name}' without an index.")
+
+                    self.match(TokenType.EQ)
+                    node = Assign(name, varType, self.expression(), line)
 
             case TokenType.REPEAT:
-                prevSymbols = set(self.symbols)
-                self.emitter.emitLine("while True:")
                 self.nextToken()
-                self.match(TokenType.NEWLINE)
-                self.emitter.scope += 1
+                self.nl()
 
-                while not self.checkToken(TokenType.UNTIL):
-                    self.statement()
+                # Not self.block(): what the body declares is still visible to the UNTIL condition
+                self.symbols.pushScope()
+                body = self.statements((TokenType.UNTIL,))
 
                 self.match(TokenType.UNTIL)
-                self.emitter.emit("if (")
-                self.comparison()
-                self.emitter.emitLine("):", 0)
-                self.emitter.scope += 1
-                self.emitter.emitLine("break")
-                self.emitter.scope -= 1
-                self.emitter.emitLine("")
-                self.emitter.scope -= 1
-
-                self.symbols = set(prevSymbols)
+                node = Repeat(body, self.comparison(), line)
+                self.symbols.popScope()
 
             case _:
                 self.abort(f"Invalid statement at {self.curToken.text} ({self.curToken.kind.name}).")
 
         self.nl()
+        return node
 
     def comparison(self):
-        self.expression()
+        left = self.expression()
 
         if self.isComparisonOperator():
-            self.emitter.emit(f" {self.curToken.text} ", 0)
+            op = self.curToken.text
             self.nextToken()
-            self.expression()
+            return Compare(op, left, self.expression())
         else:
             self.abort(f"Expected comparison operator at: {self.curToken.text}.")
 
     def expression(self):
-        self.term()
+        node = self.term()
 
         while self.checkToken(TokenType.PLUS) or self.checkToken(TokenType.MINUS):
-            self.emitter.emit(f" {self.curToken.text} ", 0)
+            op = self.curToken.text
             self.nextToken()
-            self.term()
+            node = BinOp(op, node, self.term())
+
+        return node
 
     def term(self):
-        self.unary()
+        node = self.unary()
 
         while self.checkToken(TokenType.ASTERISK) or self.checkToken(TokenType.SLASH):
-            self.emitter.emit(f" {self.curToken.text} ", 0)
+            op = self.curToken.text
             self.nextToken()
-            self.unary()
+            node = BinOp(op, node, self.unary())
+
+        return node
 
     def unary(self):
         if self.checkToken(TokenType.PLUS) or self.checkToken(TokenType.MINUS):
-            self.emitter.emit(f"{self.curToken.text}", 0)
+            op = self.curToken.text
             self.nextToken()
-        self.primary()
+            return UnaryOp(op, self.primary())
+
+        return self.primary()
 
     def primary(self):
         if self.checkToken(TokenType.NUMBER):
-            self.emitter.emit(f"{self.curToken.text}", 0)
+            node = Number(self.curToken.text)
 
-            self.nextToken()
         elif self.checkToken(TokenType.IDENT):
-            if self.curToken.text == "TRUE":
-                self.emitter.emit("True", 0)
-            elif self.curToken.text == "FALSE":
-                self.emitter.emit("False", 0)
+            name = self.curToken.text
+
+            if name == "TRUE":
+                node = Boolean(True)
+            elif name == "FALSE":
+                node = Boolean(False)
 
-            elif not checkItem(self.symbols, self.curToken.text):
-                self.abort(f"Referencing variable before assignment: {self.curToken.text}.")
+            elif name not in self.symbols:
+                self.abort(f"Referencing variable before assignment: {name}.")
+
+            elif isinstance(self.symbols.lookup(name), ArrayType):
+                self.nextToken()
+                if not self.checkToken(TokenType.OPEN_SQ_BRAC):
+                    self.abort(f"Array '{name}' used without an index.")
+
+                varType = self.symbols.lookup(name)
+                return Index(name, self.subscript(name, varType), varType)
 
             else:
-                self.emitter.emit(f"{self.curToken.text}", 0)
-            self.nextToken()
+                node = Name(name, self.symbols.lookup(name))
         else:
             # Error!
             self.abort(f"Unexpected token at {self.curToken.text}.")
 
+        self.nextToken()
+        return node
+
+    def subscript(self, name, varType):  # [<expr>]
+        if not isinstance(varType, ArrayType):
+            self.abort(f"'{name}' is not an array.")
+
+        self.match(TokenType.OPEN_SQ_BRAC)
+        index = self.expression()
+
+        # A literal index can be checked now; the generated code checks the rest when it runs
+        literal = index.operand if isinstance(index, UnaryOp) else index
+        if isinstance(literal, Number) and literal.text.isdigit():
+            value = -int(literal.text) if index is not literal and index.op == "-" else int(literal.text)
+            if not varType.lower <= value <= varType.upper:
+                self.abort(f"Index {value} is outside the bounds of array '{name}': [{varType.lower}:{varType.upper}].")
+
+        self.match(TokenType.CLOSE_SQ_BRAC)
+        return index
+
+    def bound(self):  # Array bound: an INTEGER literal, optionally negative
+        negative = self.checkToken(TokenType.MINUS)
+        if negative:
+            self.nextToken()
+
+        text = self.curToken.text
+        self.match(TokenType.NUMBER)
+
+        if not text.isdigit():
+            self.abort(f"Array bounds must be INTEGERs, got '{text}'.")
+
+        return -int(text) if negative else int(text)
+
     def isComparisonOperator(self) -> bool:
         return self.checkToken(TokenType.GT) or self.checkToken(TokenType.GTEQ) or self.checkToken(TokenType.LT) or self.checkToken(TokenType.LTEQ) or self.checkToken(TokenType.EQEQ) or self.checkToken(TokenType.NOTEQ)
 
     def program(self):
-        self.emitter.headerLine("def main():")
-        self.emitter.scope += 1
-        while self.checkToken(TokenType.NEWLINE):
+        body = []
+        try:
+            # The first tokens are read in here too, the lexer can run into too many errors on them already
+            self.nextToken()
             self.nextToken()
 
-        while not self.checkToken(TokenType.EOF):
-            self.statement()
-
-        self.emitter.emitLine('return')
+            while self.checkToken(TokenType.NEWLINE):
+                self.nextToken()
 
-        self.emitter.scope -= 1
+            self.statements((TokenType.EOF,), body)
+        except StopParsing:  # Too many errors to carry on, see diagnostics.check()
+            pass  # The top-level statements finished so far are kept, so they're still type-checked
 
-        self.emitter.emitLine('\nmain()')
-        self.emitter.writeFile()
+        return Program(body)
@@ -0,0 +1,52 @@
+import builtins
+import marshal
+import sys
+import traceback
+import driver
+from backends import pyast
+
+# Compile-and-run for the Python backend, in this process: the syntax tree is turned into an ast.Module
+# (backends/pyast.py) that goes straight to compile(), and the code object is exec'd. No Python source is
+# generated and nothing is written to disk. Code objects are cached (kind "code") with
+# marshal, so running unchanged pseudocode again skips lexing, parsing and code generation entirely.
+
+
+def load(path, level=0, fastIO=False, compileCache=None, maxErrors=1, lexJobs=1, log=None):
+    # Code object for the pseudocode file at path
+    with open(path, 'r') as i:
+        source = i.read()
+
+    key = None
+    if compileCache is not None:
+        # Bytecode and the marshal format are specific to the interpreter version
+        key = compileCache.key(source, driver.VERSION, pyast.NAME, f"O{level}", f"fastIO={fastIO}", sys.version)
+        entry = compileCache.get(key)
+
+        if entry is not None:
+            with open(entry, 'rb') as f:
+                return marshal.loads(f.read())
+
+    tree = pyast.Builder(fastIO).module(driver.parse(source, level, maxErrors, lexJobs, log))
+    code = compile(tree, path, "exec")
+
+    if compileCache is not None:
+        compileCache.putBytes(key, marshal.dumps(code))
+        compileCache.trim()
+
+    return code
+
+
+def run(code):
+    # Execute as the main program; returns the exit status
+    namespace = {"__name__": "__main__", "__builtins__": builtins}
+
+    try:
+        exec(code, namespace)
+    except Exception as error:
+        # Leave this frame out of the traceback, it's the program's error
+        traceback.print_exception(type(error), error, error.__traceback__.tb_next)
+        return 1
+    finally:
+        sys.stdout.flush()
+
+    return 0
@@ -0,0 +1,125 @@
+import argparse
+import asyncio
+import concurrent.futures
+import importlib
+import json
+import os
+import signal
+import client
+
+# Resident compile server. Listens on a Unix socket for newline-delimited JSON requests from client.py
+# and compiles them in a pool of worker processes that have already imported the lexer, parser,
+# emitter and every backend, so no request pays for interpreter startup or imports.
+#
+# Request:  {"cwd": dir, "path": source, "targets": ["py", ...], "cache": true, "level": 0,
+#            "fastIO": false, "maxErrors": 1}
+# Response: {"status": 0 or 1, "output": text main.py would have printed}
+
+
+def warm():
+    # Worker initializer: import the whole pipeline once per worker
+    global driver, cache
+    import backends
+    import cache
+    import driver
+
+    for module in set(backends.BACKENDS.values()):
+        importlib.import_module(f"backends.{module}")
+
+
+def compileRequest(cwd, path, targets, useCache, level, fastIO, maxErrors=1):
+    output = []
+
+    try:
+        selected = driver.loadBackends(targets)
+        for backend in selected:
+            output.append(f"Compiling to {backend.NAME}.")
+
+        compileCache = cache.CompileCache() if useCache else None
+        outputs = [(backend, os.path.join(cwd, backend.OUTPUT)) for backend in selected]
+        driver.compileFile(os.path.join(cwd, path), outputs, compileCache, level, fastIO, maxErrors)
+
+        if compileCache is not None:
+            compileCache.trim()
+
+    except SystemExit as error:  # Compile errors abort through sys.exit
+        output.append(str(error.code))
+        return 1, "\n".join(output)
+
+    except OSError as error:
+        output.append(str(error))
+        return 1, "\n".join(output)
+
+    output.append("Compiling complete")
+    return 0, "\n".join(output)
+
+
+class Server():
+    def __init__(self, path, workers) -> None:
+        self.path = path
+        self.pool = concurrent.futures.ProcessPoolExecutor(workers, initializer=warm)
+        self.served = 0
+
+    async def handle(self, reader, writer):
+        loop = asyncio.get_running_loop()
+
+        try:
+            while line := await reader.readline():  # A connection may send several requests
+                try:
+                    request = json.loads(line)
+                    status, output = await loop.run_in_executor(
+                        self.pool, compileRequest,
+                        request["cwd"], request["path"], request["targets"], request.get("cache", True),
+                        request.get("level", 0), request.get("fastIO", False), request.get("maxErrors", 1))
+                except (ValueError, KeyError, TypeError) as error:
+                    status, output = 1, f"Bad request: {error}"
+
+                self.served += 1
+                writer.write(json.dumps({"status": status, "output": output}).encode() + b"\n")
+                await writer.drain()
+
+        except ConnectionError:
+            pass
+
+        finally:
+            writer.close()
+
+    async def serve(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)  # Left behind by a server that didn't shut down cleanly
+
+        server = await asyncio.start_unix_server(self.handle, self.path)
+        print(f"Compile server listening on {self.path}.", flush=True)
+
+        stop = asyncio.Event()
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stop.set)
+
+        async with server:
+            await stop.wait()
+
+    def run(self):
+        # Start every worker up front so the first requests don't pay for it either
+        list(self.pool.map(int, range(self.pool._max_workers)))
+
+        try:
+            asyncio.run(self.serve())
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.pool.shutdown()
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            print(f"Compile server stopped after {self.served} requests.")
+
+
+def main():
+    args = argparse.ArgumentParser(description="Resident CIE pseudocode compile server.")
+    args.add_argument("--socket", default=client.socketPath(), help="Unix socket to listen on")
+    args.add_argument("-j", "--workers", type=int, default=os.cpu_count() or 1, help="worker processes")
+    options = args.parse_args()
+
+    Server(options.socket, options.workers).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+class SymbolTable():
+    # Scoped symbol table. Names can't be re-declared while an outer declaration is still visible,
+    # so no scope ever shadows another and one flat name -> type dict can hold every visible symbol.
+    # Each open scope keeps the list of names it declared; entering a block pushes an empty list and
+    # leaving it deletes just those names. Lookups are a single dict access however deep the nesting.
+    def __init__(self) -> None:
+        self.symbols = {}
+        self.scopes = [[]]
+
+    def __contains__(self, name):
+        return name in self.symbols
+
+    def lookup(self, name):
+        return self.symbols.get(name)
+
+    def declare(self, name, type):
+        self.symbols[name] = type
+        self.scopes[-1].append(name)
+
+    def pushScope(self):
+        self.scopes.append([])
+
+    def popScope(self):
+        for name in self.scopes.pop():
+            del self.symbols[name]
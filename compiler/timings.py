@@ -0,0 +1,148 @@
+import contextlib
+import cProfile
+import json
+import os
+import time
+import tracemalloc
+from lex import *
+from parser import *
+from emit import *
+from optimize import *
+from typecheck import *
+from symbols import *
+
+# Instrumented compile for --timings and --profile. Runs the same phases as driver.compileFile, one at a time
+# so each can be timed: lexing the whole file into a TokenBuffer, parsing it, type-checking and optimizing it,
+# then generating and writing every target. The cache is bypassed since the point is to see where compiling spends its time.
+# The file is always read into a str and lexed by Lexer, so for files of driver.MMAP_BYTES or more, which a compile
+# memory-maps and lexes with FileLexer, the lexing times and memory use aren't those of a real compile.
+#
+# Wall times come from a plain run. Peak memory comes from a second run under tracemalloc, which slows
+# everything down too much to time at the same time, and profiles from a third under cProfile.
+
+
+class CountingSymbolTable(SymbolTable):
+    # Counts what the parser asks of the symbol table, at the cost of a method call per lookup, which is
+    # why the normal compile doesn't use it
+    def __init__(self) -> None:
+        super().__init__()
+        self.lookups = 0
+        self.declarations = 0
+
+    def __contains__(self, name):
+        self.lookups += 1
+        return name in self.symbols
+
+    def lookup(self, name):
+        self.lookups += 1
+        return self.symbols.get(name)
+
+    def declare(self, name, type):
+        self.declarations += 1
+        super().declare(name, type)
+
+
+@contextlib.contextmanager
+def timed(results, name):
+    start = time.perf_counter()
+    yield
+    results[name] = time.perf_counter() - start
+
+
+@contextlib.contextmanager
+def traced(results, name):
+    tracemalloc.reset_peak()
+    yield
+    results[name] = tracemalloc.get_traced_memory()[1]
+
+
+def compilePhases(source, outputs, level, fastIO, phase, symbols):
+    with phase("lex"):
+        buffer = Lexer(source).tokenize()
+
+    with phase("parse"):
+        program = Parser(buffer, symbols).program()
+
+    with phase("typecheck"):
+        program = TypeChecker().program(program)
+
+    with phase("optimize"):
+        program = Optimizer(level).program(program)
+
+    for backend, output in outputs:
+        emitter = Emitter(output)
+        with phase(f"emit {backend.NAME}"):
+            backend.Generator(emitter, fastIO).program(program)
+
+        with phase(f"write {backend.NAME}"):
+            emitter.writeFile()
+
+    return len(buffer)
+
+
+def measure(path, outputs, level=0, fastIO=False, profile=None):
+    # Report on compiling the file at path to outputs ((backend, output path) pairs), as a JSON-ready dict.
+    # With profile, cProfile stats for the compile are also written to that file.
+    times = {}
+    with timed(times, "read"):
+        with open(path, 'r') as i:
+            source = i.read()
+
+    symbols = CountingSymbolTable()
+    tokens = compilePhases(source, outputs, level, fastIO, lambda name: timed(times, name), symbols)
+
+    # The outputs are already written, so the other runs write to nowhere
+    discard = [(backend, os.devnull) for backend, _ in outputs]
+
+    peaks = {}
+    tracemalloc.start()
+    try:
+        compilePhases(source, discard, level, fastIO, lambda name: traced(peaks, name), SymbolTable())
+    finally:
+        tracemalloc.stop()
+
+    if profile is not None:
+        profiler = cProfile.Profile()
+        profiler.runcall(compilePhases, source, discard, level, fastIO, lambda name: contextlib.nullcontext(),
+                         SymbolTable())
+        profiler.dump_stats(profile)
+
+    return {
+        "file": path,
+        "lines": source.count("\n") + 1,
+        "tokens": tokens,
+        "symbols": {"lookups": symbols.lookups, "declarations": symbols.declarations},
+        "emitted": {backend.NAME: os.path.getsize(output) for backend, output in outputs},
+        "seconds": times,
+        "total": sum(times.values()),
+        "peakMemory": peaks,
+    }
+
+
+def describe(report):
+    # Human readable lines for a report from measure()
+    lines = [f"{report['file']}: {report['lines']:,} lines, {report['tokens']:,} tokens, "
+             f"{report['symbols']['lookups']:,} symbol lookups, {report['symbols']['declarations']:,} declarations"]
+
+    for name, seconds in report["seconds"].items():
+        peak = report["peakMemory"].get(name)
+        lines.append(f"  {name:<20} {seconds * 1000:9.2f} ms"
+                     + ("" if peak is None else f"  peak {peak / 2**20:7.2f} MiB"))
+
+    lines.append(f"  {'total':<20} {report['total'] * 1000:9.2f} ms")
+
+    for name, size in report["emitted"].items():
+        lines.append(f"  emitted {size:,} bytes of {name}")
+
+    return lines
+
+
+def save(reports, path):
+    # Append reports to path as JSON lines ("-" for stdout), so the results of many runs can be collected in one file
+    lines = "".join(json.dumps(report) + "\n" for report in reports)
+
+    if path == "-":
+        sys.stdout.write(lines)
+    else:
+        with open(path, 'a') as f:
+            f.write(lines)
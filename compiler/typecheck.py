@@ -0,0 +1,214 @@
+import sys
+from nodes import *
+from symbols import *
+from diagnostics import *
+
+# Type inference over expressions, run between parsing and optimizing. Every expression's type follows from the
+# declared types of the names in it, which the pass uses to pick operators and to catch values that don't mix:
+#
+# INTEGER / INTEGER is integer division, truncating towards zero: the BinOp's op becomes "//", native in C++ and a
+# small helper in Python (whose own // rounds down). Where the result is stored into a REAL or mixed with one, it
+# stays a true division instead, with the left side converted to REAL so C++ doesn't divide ints either (see real()).
+# A REAL stored into an INTEGER, or used as an array index, is wrapped in a Convert that truncates it like C++ does.
+# Arithmetic, comparisons and assignments between types that don't go together (e.g. STRING and INTEGER) are errors.
+# With a Diagnostics, every error is recorded rather than the first exiting; an expression with an error in it has
+# no type (None), which doesn't make any more errors.
+
+NUMBERS = ("INTEGER", "REAL")
+TEXT = ("STRING", "CHAR")
+
+
+def compatible(a, b):
+    return a == b or a in NUMBERS and b in NUMBERS or a in TEXT and b in TEXT
+
+
+class TypeChecker():
+    def __init__(self, constants=None, diagnostics=None) -> None:
+        self.constants = SymbolTable() if constants is None else constants  # CONSTANT name -> type of its value
+        self.line = 0  # Line of the statement being checked
+        self.diagnostics = diagnostics
+
+    def program(self, program):
+        try:
+            self.body(program.body)
+        except StopParsing:  # Too many errors to carry on, see diagnostics.check()
+            pass
+
+        return program
+
+    def block(self, body):
+        self.constants.pushScope()
+        self.body(body)
+        self.constants.popScope()
+
+    def body(self, body):
+        for statement in body:
+            self.statement(statement)
+
+    def abort(self, message):
+        if self.diagnostics is None:
+            sys.exit(f"Error on line {self.line}: {message}")
+
+        self.diagnostics.add(Diagnostic(message, self.line, None))
+
+    def statement(self, node):
+        self.line = node.line
+
+        match node:
+            case Output(value):
+                self.expression(value)
+
+            case If(branches, orelse):
+                for condition, body in branches:
+                    self.line = node.line
+                    self.expression(condition)
+                    self.block(body)
+
+                if orelse is not None:
+                    self.block(orelse)
+
+            case While(condition, body):
+                self.expression(condition)
+                self.block(body)
+
+            case Repeat(body, condition):
+                # Like the parser, the body's scope stays open for the UNTIL condition
+                self.constants.pushScope()
+                self.body(body)
+                self.line = node.line
+                self.expression(condition)
+                self.constants.popScope()
+
+            case For(_, start, end, step, body):
+                for bound in (start, end, step):
+                    boundType = "INTEGER" if bound is None else self.expression(bound)
+                    if boundType not in ("INTEGER", None):
+                        self.abort(f"FOR bounds must be INTEGERs, got '{boundType}'.")
+
+                self.block(body)
+
+            case Block(body):
+                self.block(body)
+
+            case Constant(name, value):
+                self.constants.declare(name, self.expression(value))
+
+            case Assign(_, varType, value):
+                node.value = self.store(varType, value)
+
+            case IndexAssign(_, index, arrayType, value):
+                node.index = self.index(index)
+                node.value = self.store(arrayType.element, value)
+
+    def store(self, varType, value):
+        # value as it's stored into a varType
+        valueType = self.expression(value)
+
+        if varType == "INTEGER" and valueType == "REAL":
+            return Convert("INTEGER", value)
+
+        if varType == "REAL" and valueType == "INTEGER":
+            return self.real(value)
+
+        if valueType is not None and not compatible(varType, valueType):
+            self.abort(f"Undefined type conversion from '{valueType}' to '{varType}'.")
+
+        return value
+
+    def index(self, index):
+        indexType = self.expression(index)
+
+        if indexType == "REAL":
+            return Convert("INTEGER", index)
+
+        if indexType not in ("INTEGER", None):
+            self.abort(f"Array index must be an INTEGER, got '{indexType}'.")
+
+        return index
+
+    def expression(self, node):
+        # Type of the expression. The commonest nodes are matched first.
+        match node:
+            case BinOp(op, left, right):
+                a, b = self.expression(left), self.expression(right)
+
+                if a == b == "INTEGER":
+                    if op == "/":
+                        node.op = "//"
+
+                    return "INTEGER"
+
+                if a in NUMBERS and b in NUMBERS:
+                    if a == "INTEGER":
+                        node.left = self.real(left)
+                    elif b == "INTEGER":
+                        node.right = self.real(right)
+
+                    return "REAL"
+
+                if a is None or b is None:
+                    return None
+
+                if op == "+" and a in TEXT and b in TEXT:
+                    return "STRING"
+
+                self.abort(f"Undefined operation '{op}' between '{a}' and '{b}'.")
+
+            case Name(name, "CONSTANT"):
+                return self.constants.lookup(name)
+
+            case Name(_, varType):
+                return varType
+
+            case Number(text):
+                return "INTEGER" if text.lstrip("-").isdigit() else "REAL"
+
+            case String():
+                return "STRING"
+
+            case Boolean():
+                return "BOOLEAN"
+
+            case Index(_, index, arrayType):
+                node.index = self.index(index)
+                return arrayType.element
+
+            case Convert(varType, value):
+                self.expression(value)
+                return varType
+
+            case UnaryOp(op, operand):
+                operandType = self.expression(operand)
+                if operandType not in NUMBERS and operandType is not None:
+                    self.abort(f"Undefined operation '{op}' on '{operandType}'.")
+
+                return operandType
+
+            case Compare(op, left, right):
+                a, b = self.expression(left), self.expression(right)
+
+                if a == "INTEGER" and b == "REAL":
+                    node.left = self.real(left)
+                elif a == "REAL" and b == "INTEGER":
+                    node.right = self.real(right)
+                elif a is not None and b is not None and not compatible(a, b):
+                    self.abort(f"Undefined comparison '{op}' between '{a}' and '{b}'.")
+
+                return "BOOLEAN"
+
+    def real(self, node):
+        # An INTEGER expression as it's worked out where a REAL is wanted: its divisions are true divisions
+        match node:
+            case BinOp("//", left, right):
+                node.op = "/"
+                node.left = Convert("REAL", self.real(left))
+                node.right = self.real(right)
+
+            case BinOp(_, left, right):
+                node.left = self.real(left)
+                node.right = self.real(right)
+
+            case UnaryOp(_, operand):
+                node.operand = self.real(operand)
+
+        return node
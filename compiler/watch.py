@@ -0,0 +1,248 @@
+import os
+import re
+import time
+from lex import *
+from parser import *
+from emit import *
+from symbols import *
+from optimize import *
+from typecheck import *
+import driver
+
+# Watch mode: keep the compiler resident and recompile a file whenever it changes on disk.
+#
+# The source is cut into chunks of whole top-level statements. A chunk boundary is placed after a
+# top-level statement depending only on that statement's own text (content-defined chunking), so an
+# edit moves at most the boundaries right next to it. Each chunk is cached by its text plus a hash of
+# the top-level declarations made before it; on a change only chunks whose key changed are re-lexed,
+# re-parsed and regenerated, the others replay their declarations and reuse their generated code.
+#
+# Each chunk is optimized on its own (Optimizer.topLevel), so dead code elimination, which needs every use of a
+# variable in the program to be in view, isn't done.
+
+# Lines that open or close a block
+OPENERS = {"IF", "WHILE", "FOR", "REPEAT"}
+BLOCK_LINE = re.compile(r"^[ \t]*(IF|WHILE|FOR|REPEAT|ENDIF|ENDWHILE|NEXT|UNTIL)\b", re.MULTILINE)
+
+CHUNK_MASK = 15  # A statement ends a chunk when its hash says so, 1 in 16: chunks of ~16 top-level statements
+
+
+def topLevelBlocks(source, lineCount):
+    # (first line, last line) indexes of every top-level block
+    blocks = []
+    depth = 0
+    line = 0
+    pos = 0
+
+    for match in BLOCK_LINE.finditer(source):
+        line += source.count("\n", pos, match.start())
+        pos = match.start()
+
+        if match.group(1) in OPENERS:
+            if depth == 0:
+                first = line
+            depth += 1
+
+        elif depth:
+            depth -= 1
+            if depth == 0:
+                blocks.append((first, line))
+
+    if depth:
+        blocks.append((first, lineCount - 1))
+
+    return blocks
+
+
+def chunks(source):
+    # Split source into (first line number, text) chunks that each end after a top-level statement.
+    # Everything per line is left to C (split, map(hash)); Python only looks at candidate boundaries.
+    lines = source.split("\n")
+    blocks = topLevelBlocks(source, len(lines))
+
+    # A block ends a chunk depending on its whole text, a line outside blocks on the line itself
+    ends = [last for first, last in blocks if hash(tuple(lines[first : last + 1])) & CHUNK_MASK == 0]
+    candidates = [i for i, h in enumerate(map(hash, lines)) if h & CHUNK_MASK == 0]
+
+    b = 0
+    for i in candidates:
+        while b < len(blocks) and blocks[b][1] < i:
+            b += 1
+
+        if (b == len(blocks) or i < blocks[b][0]) and lines[i].strip():
+            ends.append(i)
+
+    ends.sort()
+    start = 0
+
+    for end in ends:
+        yield start + 1, "\n".join(lines[start : end + 1])
+        start = end + 1
+
+    if start < len(lines):
+        yield start + 1, "\n".join(lines[start:])
+
+
+class Chunk():
+    __slots__ = ("body", "declared", "types", "constants", "code")
+
+    def __init__(self, body, declared, types, constants) -> None:
+        self.body = body  # Top-level statements
+        self.declared = declared  # (name, type) pairs it declared at the top level
+        self.types = types  # (name, type) pairs of its top-level CONSTANTs' values, for the type checker
+        self.constants = constants  # (name, literal) pairs of the top-level CONSTANTs the optimizer substitutes
+        self.code = {}  # Backend NAME -> (generated code for the statements, what it requires in the preamble)
+
+
+class Watcher():
+    def __init__(self, path, selected, level=0, fastIO=False) -> None:
+        self.path = path
+        self.selected = selected  # Backends
+        self.level = level  # Optimization level
+        self.fastIO = fastIO
+        self.outputs = {backend.NAME: None for backend in selected}  # Last written code
+        self.cache = {}
+
+    def generateChunk(self, backend, body):
+        emitter = Emitter(None)
+        generator = backend.Generator(emitter, self.fastIO)
+        emitter.scope = 1  # Top-level statements sit inside main()
+
+        for statement in body:
+            generator.statement(statement)
+
+        return emitter.getCode(), generator.requires
+
+    def wrapper(self, backend, requires):
+        # What begin() and end() put around the top-level statements, with the preamble for all the chunks
+        emitter = Emitter(None)
+        generator = backend.Generator(emitter, self.fastIO)
+        generator.requires = requires
+        generator.begin()
+        generator.end()
+        generator.preamble()
+
+        header = "".join(emitter.header)
+        return header, emitter.getCode()[len(header):]
+
+    def compile(self, source):
+        # Returns (chunks that had to be parsed again, total chunks)
+        symbols = SymbolTable()
+        types = SymbolTable()
+        constants = SymbolTable()
+        state = 0  # Hash chain of the top-level declarations and constant values so far
+        cache = {}
+        order = []
+        parsed = 0
+
+        for line, text in chunks(source):
+            key = (text, state)
+            chunk = self.cache.get(key) or cache.get(key)
+
+            if chunk is None:
+                before = len(symbols.scopes[0])
+                beforeTypes = len(types.scopes[0])
+                beforeConstants = len(constants.scopes[0])
+
+                body = Parser(Lexer(text, line), symbols).program().body
+                TypeChecker(types).body(body)
+                if self.level:
+                    body = Optimizer(self.level, constants).topLevel(body)
+
+                chunk = Chunk(body, tuple((name, symbols.lookup(name)) for name in symbols.scopes[0][before:]),
+                              tuple((name, types.lookup(name)) for name in types.scopes[0][beforeTypes:]),
+                              tuple((name, constants.lookup(name)) for name in constants.scopes[0][beforeConstants:]))
+                parsed += 1
+            else:
+                for name, varType in chunk.declared:
+                    symbols.declare(name, varType)
+                for name, varType in chunk.types:
+                    types.declare(name, varType)
+                for name, value in chunk.constants:
+                    constants.declare(name, value)
+
+            cache[key] = chunk
+            order.append(chunk)
+            if chunk.declared:
+                state = hash((state, chunk.declared, chunk.types, repr(chunk.constants)))
+
+        # Only chunks that are part of the current source stay cached
+        self.cache = cache
+
+        for backend in self.selected:
+            if not backend.INCREMENTAL:  # Still saves the parsing, only generation is done from scratch
+                emitter = Emitter(None)
+                backend.Generator(emitter, self.fastIO).program(Program([s for chunk in order for s in chunk.body]))
+                self.write(backend, emitter.getCode())
+                continue
+
+            parts = []
+            requires = set()
+
+            for chunk in order:
+                if backend.NAME not in chunk.code:
+                    chunk.code[backend.NAME] = self.generateChunk(backend, chunk.body)
+
+                code, required = chunk.code[backend.NAME]
+                parts.append(code)
+                requires |= required
+
+            header, footer = self.wrapper(backend, requires)
+            self.write(backend, header + "".join(parts) + footer)
+
+        return parsed, len(order)
+
+    def write(self, backend, code):
+        if code != self.outputs[backend.NAME]:
+            with open(backend.OUTPUT, 'w') as f:
+                f.write(code)
+            self.outputs[backend.NAME] = code
+
+    def rebuild(self):
+        start = time.perf_counter()
+
+        with open(self.path, 'r') as i:
+            source = i.read()
+
+        try:
+            parsed, total = self.compile(source)
+
+        except SystemExit:
+            # The splitter can be fooled (e.g. by a multi-line string), so confirm with a full compile
+            self.cache = {}
+            try:
+                program = driver.parse(source, self.level)
+            except SystemExit as error:
+                print(f"{error.code} (output not updated)")
+                return
+
+            for backend in self.selected:
+                emitter = Emitter(None)
+                backend.Generator(emitter, self.fastIO).program(program)
+                self.write(backend, emitter.getCode())
+
+            parsed, total = 1, 1
+
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"Recompiled in {elapsed:.1f} ms ({parsed}/{total} chunks parsed).")
+
+    def run(self, interval=0.05):
+        print(f"Watching {self.path} (Ctrl-C to stop).")
+        last = None
+
+        try:
+            while True:
+                try:
+                    info = os.stat(self.path)
+                    stamp = (info.st_mtime_ns, info.st_size)
+                except FileNotFoundError:  # Editors may briefly remove the file while saving
+                    stamp = None
+
+                if stamp is not None and stamp != last:
+                    last = stamp
+                    self.rebuild()
+
+                time.sleep(interval)
+
+        except KeyboardInterrupt:
+            print("Stopped watching.")